@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Mapping
+
+from asyncua import ua
+
+from config import SCAN_CLASSES, REQUEST_DEADLINE_MS
+from opcua_client import PENDING
+from tags import TAGS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PlantSnapshot:
+    version: int
+    timestamp: float
+    values: Mapping[str, Any]
+    data_values: Mapping[str, ua.DataValue] = field(default_factory=lambda: MappingProxyType({}))
+
+    def get(self, name: str, default=None):
+        value = self.values.get(name)
+        return default if value is None else value
+
+    def quality(self, name: str) -> str:
+        data_value = self.data_values.get(name)
+        if data_value is None or data_value.StatusCode.is_bad():
+            return "bad"
+        return "uncertain" if data_value.StatusCode.is_uncertain() else "good"
+
+    def source_timestamp(self, name: str):
+        data_value = self.data_values.get(name)
+        if data_value is None:
+            return None
+        return data_value.SourceTimestamp or data_value.ServerTimestamp
+
+
+class ScanEngine:
+    def __init__(self, provider, historian=None):
+        self.provider = provider
+        self.historian = historian
+        self.groups = TAGS.by_scan_class
+        self.node_ids = {
+            scan_class: list(dict.fromkeys(tag.node_id for tag in tags))
+            for scan_class, tags in self.groups.items()
+        }
+        self.snapshot = PlantSnapshot(0, 0.0, MappingProxyType(dict.fromkeys(TAGS)))
+        self._tasks = []
+        self._updated = asyncio.Condition()
+
+    async def wait_for_update(self, version: int) -> PlantSnapshot:
+        async with self._updated:
+            await self._updated.wait_for(lambda: self.snapshot.version > version)
+        return self.snapshot
+
+    async def start(self):
+        for scan_class in self.groups:
+            await self.scan(scan_class)
+        self._tasks = [asyncio.create_task(self._run(scan_class)) for scan_class in self.groups]
+        classes = ", ".join(f"{c}={len(t)}@{SCAN_CLASSES[c]}ms" for c, t in self.groups.items())
+        logger.info(f"✅ Acquisition démarrée ({classes})")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run(self, scan_class: str):
+        loop = asyncio.get_running_loop()
+        period = SCAN_CLASSES[scan_class] / 1000
+        while True:
+            started = loop.time()
+            await self.scan(scan_class)
+            await asyncio.sleep(max(0.0, period - (loop.time() - started)))
+
+    async def scan(self, scan_class: str):
+        node_ids = self.node_ids[scan_class]
+        try:
+            results = await self.provider.read_variables(node_ids, deadline=REQUEST_DEADLINE_MS / 1000)
+        except Exception as e:
+            logger.error(f"Erreur cycle d'acquisition {scan_class}: {e}")
+            return self.snapshot
+
+        by_node = {node_id: result for node_id, result in zip(node_ids, results) if result.StatusCode.value != PENDING}
+        scanned = {tag.name: by_node[tag.node_id] for tag in self.groups[scan_class] if tag.node_id in by_node}
+        if self.historian is not None:
+            self.historian.record(scanned)
+
+        if any(self._changed(name, data_value) for name, data_value in scanned.items()):
+            values = dict(self.snapshot.values)
+            values.update((name, sample_value(data_value)) for name, data_value in scanned.items())
+            data_values = dict(self.snapshot.data_values)
+            data_values.update(scanned)
+            self.snapshot = PlantSnapshot(
+                version=self.snapshot.version + 1,
+                timestamp=time.time(),
+                values=MappingProxyType(values),
+                data_values=MappingProxyType(data_values),
+            )
+            async with self._updated:
+                self._updated.notify_all()
+        return self.snapshot
+
+    def _changed(self, name: str, data_value: ua.DataValue) -> bool:
+        previous = self.snapshot.data_values.get(name)
+        return (
+            previous is None
+            or previous.StatusCode.value != data_value.StatusCode.value
+            or self.snapshot.values[name] != sample_value(data_value)
+        )
+
+
+def sample_value(data_value: ua.DataValue):
+    return None if data_value.StatusCode.is_bad() else data_value.Value.Value
@@ -0,0 +1,317 @@
+import sys
+import timeit
+from datetime import datetime, timezone
+from functools import partial
+from types import MappingProxyType
+
+from asyncua import ua
+
+from acquisition import PlantSnapshot
+from fragments import FragmentCache, mark_quality
+from offline_data import get_offline_value
+from routers import sequences, exploitation
+from tags import TAGS
+
+ITERATIONS = 5000
+REPEAT = 5
+
+
+def sample_values() -> dict:
+    values = {}
+    for name in TAGS:
+        value = get_offline_value(name)
+        if name.endswith(("_ic", "_pc")):
+            value = int(value or 0)
+        values[name] = value
+    return values
+
+
+def sample_data_values(values: dict) -> MappingProxyType:
+    now = datetime.now(timezone.utc)
+    return MappingProxyType({
+        name: ua.DataValue(ua.Variant(value), SourceTimestamp=now, ServerTimestamp=now)
+        for name, value in values.items()
+    })
+
+
+# Reference: the per-PDC f-string builder that the Jinja template replaced, parametrized by names.
+def fstring_pdc(pdc: sequences.PDC, values) -> str:
+    seq, hc, evi, dcbm = pdc.seq, pdc.hc, pdc.evi, pdc.dcbm
+    seq_ic = values[f"{seq}_ic"]
+    seq_pc = values[f"{seq}_pc"]
+    seq_hmi = values[f"{seq}_hmi"]
+    evi_cp_status = values[f"{evi}_cp_status"]
+    evi_pilot = values[f"{evi}_pilot"]
+
+    seq_ready_class = "success" if values[f"{seq}_ready"] else "danger"
+    seq_fault_class = "danger" if values[f"{seq}_fault"] else "inactive"
+    ic_html = "<br>".join(sequences.decode_bits(seq_ic, sequences.IC_MAP))
+    pc_html = "<br>".join(sequences.decode_bits(seq_pc, sequences.PC_MAP))
+    hmi_state = sequences.decode_hmi(seq_hmi)
+    cp_status_text = sequences.decode_CPStatusCode(evi_cp_status)
+    pilot_text = sequences.decode_PilotStatus(evi_pilot)
+
+    return f"""
+    <div class="seq-section">
+        <h4>Sequence {seq[3:]}</h4>
+        <div class="data-row">
+            <span class="label">Ready</span>
+            <span class="indicator {seq_ready_class}"></span>
+        </div>
+        <div class="data-row">
+            <span class="label">Fault</span>
+            <span class="indicator {seq_fault_class}"></span>
+        </div>
+        <div class="data-row">
+            <span class="label">IC</span>
+            <div style="display: flex; flex-direction: column; gap: 0.2rem; align-items: flex-end;">
+                <span class="value">{seq_ic}</span>
+                <div style="font-size: 0.62rem; color: var(--text-secondary); text-align: left;">
+                    {ic_html}
+                </div>
+            </div>
+        </div>
+
+        <div class="data-row">
+            <span class="label">PC</span>
+            <div style="display: flex; flex-direction: column; gap: 0.2rem; align-items: flex-end;">
+                <span class="value">{seq_pc}</span>
+                <div style="font-size: 0.62rem; color: var(--text-secondary); text-align: left;">
+                    {pc_html}
+                </div>
+            </div>
+        </div>
+        <div class="data-row">
+            <span class="label">Step</span>
+            <span class="value">{values[f"{seq}_branch"]}</span>
+        </div>
+        <div class="data-row">
+            <span class="label">HMI</span>
+            <div style="display: flex; flex-direction: column; gap: 0.2rem; align-items: flex-end;">
+                <span class="value">{seq_hmi}</span>
+                <span style="font-size: 0.62rem; color: var(--text-secondary);">{hmi_state}</span>
+            </div>
+        </div>
+        <div class="cmd-row">
+            <button class="cmd-btn" hx-post="/api/sequences/{seq}/ack" hx-swap="none">Séquence {seq[3:]} - Ack</button>
+        </div>
+    </div>
+
+    <div class="seq-section">
+        <h4>{hc.upper()}</h4>
+        <div class="data-row">
+            <span class="label">Current Measurement</span>
+            <span class="value">{values[f"{hc}_current"]:.2f} A</span>
+        </div>
+        <div class="data-row">
+            <span class="label">Voltage Measurement</span>
+            <span class="value">{values[f"{hc}_voltage"]:.2f} V</span>
+        </div>
+        <div class="data-row">
+            <span class="label">Power limitation</span>
+            <span class="value">{values[f"{pdc.pdc}_plim"]:.2f} Kw</span>
+        </div>
+    </div>
+
+    <div class="seq-section">
+        <h4>{evi.upper()}</h4>
+        <div class="data-row">
+            <span class="label">CP Status Code</span>
+            <div style="display: flex; flex-direction: column; gap: 0.2rem; align-items: flex-end;">
+                <span class="value">{evi_cp_status}</span>
+                <span style="font-size: 0.62rem; color: var(--text-secondary);">{cp_status_text}</span>
+            </div>
+        </div>
+        <div class="data-row">
+            <span class="label">Substate</span>
+            <span class="value">{values[f"{evi}_substatus"]}</span>
+        </div>
+        <div class="data-row">
+            <span class="label">Error Code</span>
+            <span class="value">{values[f"{evi}_error"]}</span>
+        </div>
+        <div class="data-row">
+            <span class="label">Pilot Status Code</span>
+            <div style="display: flex; flex-direction: column; gap: 0.2rem; align-items: flex-end;">
+                <span class="value">{evi_pilot}</span>
+                <span style="font-size: 0.62rem; color: var(--text-secondary);">{pilot_text}</span>
+            </div>
+        </div>
+        <div class="data-row">
+            <span class="label">EVI Voltage Measurement</span>
+            <span class="value">{values[f"{evi}_voltage"]} V</span>
+        </div>
+        <div class="data-row">
+            <span class="label">Target Current</span>
+            <span class="value">{values[f"{evi}_target_current"]} A</span>
+        </div>
+        <div class="data-row">
+            <span class="label">Target Voltage</span>
+            <span class="value">{values[f"{evi}_target_voltage"]} V</span>
+        </div>
+        <div class="data-row">
+            <span class="label">SOC</span>
+            <span class="value">{values[f"{evi}_soc"]} %</span>
+        </div>
+        <div class="cmd-row">
+            <button class="cmd-btn" hx-post="/api/sequences/{evi}/ack" hx-swap="none">EVI - Ack</button>
+            <button class="cmd-btn" hx-post="/api/sequences/{evi}/es" hx-swap="none">EVI - ES</button>
+        </div>
+    </div>
+
+    <div class="seq-section">
+        <h4>Temperature</h4>
+        <div class="data-row">
+            <span class="label">Temperature pistolet 1</span>
+            <span class="value">{values[f"{evi}_temp1"]} °C</span>
+        </div>
+        <div class="data-row">
+            <span class="label">Temperature pistolet 2</span>
+            <span class="value">{values[f"{evi}_temp2"]} °C</span>
+        </div>
+        <div class="data-row">
+            <span class="label">Temperature DCBM_H</span>
+            <span class="value">{values[f"{dcbm}_temp_h"]} °C</span>
+        </div>
+        <div class="data-row">
+            <span class="label">Temperature DCBM_L</span>
+            <span class="value">{values[f"{dcbm}_temp_l"]} °C</span>
+        </div>
+    </div>
+    """
+
+
+# Reference: the per-station f-string builder that the Jinja template replaced, parametrized by names.
+def fstring_cs(cs: exploitation.ChargingStation, values) -> str:
+    pair = cs.pair
+    pdc_a, pdc_b = cs.pdcs
+    evip_a, evip_b = cs.evips
+    color_a = exploitation.get_status_color(values[f"{pdc_a}_status_color"])
+    color_b = exploitation.get_status_color(values[f"{pdc_b}_status_color"])
+    manu_a_class = "cmd-btn-stop-active" if values[f"{pdc_a}_manu_indispo"] else "cmd-btn"
+    manu_b_class = "cmd-btn-stop-active" if values[f"{pdc_b}_manu_indispo"] else "cmd-btn"
+    tilt_sensor_class = "danger" if values[f"tilt_sensor_pdc{pair}"] else "inactive"
+    ack_tilt_class = "cmd-btn-active" if values[f"pdc{pair}_ack_tilt"] else "cmd-btn"
+    restart_class = "cmd-btn-stop-active" if values[f"pdc{pair}_restart"] else "cmd-btn"
+    endpoint_class = "success" if values[f"endpoint{pair}_ok"] else "danger"
+    evip_a_class = "danger" if values[f"{evip_a}_remote_unavailable"] else "inactive"
+    evip_b_class = "danger" if values[f"{evip_b}_remote_unavailable"] else "inactive"
+    paiement_class = "cmd-btn-stop-active" if values[f"paiement_bypass_{pair}"] else "cmd-btn"
+
+    return f"""
+    <div class="seq-section">
+        <div class="data-row">
+            <span class="label">{pdc_a.upper()} Status</span>
+            <div style="display: flex; align-items: center; gap: 0.5rem;">
+                <span class="value" style="color: {color_a}">{values[f"{pdc_a}_status_text"]}</span>
+                <span class="indicator" style="background: {color_a};"></span>
+            </div>
+        </div>
+        <div class="data-row">
+            <span class="label">{pdc_b.upper()} Status</span>
+            <div style="display: flex; align-items: center; gap: 0.5rem;">
+                <span class="value" style="color: {color_b}">{values[f"{pdc_b}_status_text"]}</span>
+                <span class="indicator" style="background: {color_b};"></span>
+            </div>
+        </div>
+    </div>
+
+    <div class="seq-section">
+        <h4>PDC Unavailable Manually</h4>
+        <div class="cmd-row">
+            <button class="{manu_a_class}" hx-post="/api/exploitation/{pdc_a}_manu_indispo/toggle" hx-swap="none">Manu Indispo {pdc_a.upper()}</button>
+            <button class="{manu_b_class}" hx-post="/api/exploitation/{pdc_b}_manu_indispo/toggle" hx-swap="none">Manu Indispo {pdc_b.upper()}</button>
+        </div>
+    </div>
+
+    <div class="seq-section">
+        <h4>{cs.label} Tilt Sensor</h4>
+        <div class="data-row">
+            <span class="label">Tilt Sensor PDC{pair}</span>
+            <span class="indicator {tilt_sensor_class}"></span>
+        </div>
+        <div class="cmd-row">
+            <button class="{ack_tilt_class}" hx-post="/api/exploitation/pdc{pair}_ack_tilt/toggle" hx-swap="none">ACK Tilt PDC{pair}</button>
+        </div>
+    </div>
+    <div class="seq-section">
+        <h4>{cs.label} Control and Rebooting</h4>
+        <div class="cmd-row">
+            <button class="{restart_class}" hx-post="/api/exploitation/pdc{pair}_restart/toggle" hx-swap="none">Restart PDC{pair}</button>
+            <button class="{paiement_class}" hx-post="/api/exploitation/paiement_{pair}/toggle" hx-swap="none">Bypass payment</button>
+        </div>
+    </div>
+
+    <div class="seq-section">
+        <h4>Connexion EndPoint{pair} via ZMQ</h4>
+        <div class="data-row">
+            <span class="label">EndPoint{pair} Connected</span>
+            <span class="indicator {endpoint_class}"></span>
+        </div>
+    </div>
+
+    <div class="seq-section">
+        <h4>Change Availability from CPO ENDPOINT{pair}</h4>
+        <div class="data-row">
+            <span class="label">{pdc_a.upper()}</span>
+            <span class="indicator {evip_a_class}"></span>
+        </div>
+        <div class="data-row">
+            <span class="label">{pdc_b.upper()}</span>
+            <span class="indicator {evip_b_class}"></span>
+        </div>
+    </div>
+    """
+
+
+def best_time(func, iterations: int) -> float:
+    return min(timeit.repeat(func, number=iterations, repeat=REPEAT)) / iterations * 1e6
+
+
+def snapshots(values: dict, data_values, count: int, changed: list = None):
+    alternate = {**values, **{name: None for name in changed or ()}}
+    return iter([
+        PlantSnapshot(version, 0.0, alternate if changed and version % 2 else values, data_values)
+        for version in range(1, count + 1)
+    ])
+
+
+def cache_time(key: str, names, render, values: dict, data_values, iterations: int, changed: list = None) -> float:
+    cache = FragmentCache()
+    feed = snapshots(values, data_values, iterations * REPEAT + 1, changed)
+
+    def get():
+        snapshot = next(feed)
+        cache.get(key, snapshot, names, lambda values: mark_quality(render(values), snapshot, names))
+
+    get()
+    return best_time(get, iterations)
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else ITERATIONS
+    values = sample_values()
+    data_values = sample_data_values(values)
+    fragments = {
+        **{key: (pdc.tags, partial(fstring_pdc, pdc), partial(sequences.render_pdc, key))
+           for key, pdc in sequences.PDCS.items()},
+        **{key: (cs.tags, partial(fstring_cs, cs), partial(exploitation.render_cs, key))
+           for key, cs in exploitation.CHARGING_STATIONS.items()},
+    }
+    print(f"{'':6} {'f-string':>11} {'jinja':>11} {'ratio':>6} {'reval.':>10} {'changed':>11} {'same ver.':>10}")
+    for key, (names, reference, render) in fragments.items():
+        before = best_time(lambda: reference(values), iterations)
+        after = best_time(lambda: render(values), iterations)
+        revalidated = cache_time(key, names, render, values, data_values, iterations)
+        rerendered = cache_time(key, names, render, values, data_values, iterations, changed=names[-1:])
+        cache = FragmentCache()
+        snapshot = PlantSnapshot(1, 0.0, values, data_values)
+        same = best_time(lambda: cache.get(key, snapshot, names, render), iterations)
+        print(
+            f"{key:6} {before:8.1f} µs {after:8.1f} µs {after / before:5.1f}x"
+            f" {revalidated:7.1f} µs {rerendered:8.1f} µs {same:7.1f} µs"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import logging
+import time
+from dataclasses import dataclass, asdict
+from asyncua import ua
+
+from config import BREAKER_FAILURES, BREAKER_BACKOFF_S, BREAKER_MAX_BACKOFF_S
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class NodeBreaker:
+    state: str = CLOSED
+    consecutive_failures: int = 0
+    failures: int = 0
+    successes: int = 0
+    skipped: int = 0
+    trips: int = 0
+    backoff_s: float = 0.0
+    retry_at: float = 0.0
+    last_status: str = ""
+
+
+class CircuitBreaker:
+    def __init__(self, threshold: int = BREAKER_FAILURES, backoff_s: float = BREAKER_BACKOFF_S,
+                 max_backoff_s: float = BREAKER_MAX_BACKOFF_S):
+        self.threshold = threshold
+        self.backoff_s = backoff_s
+        self.max_backoff_s = max_backoff_s
+        self.nodes = {}
+
+    def allow(self, node_id: str) -> bool:
+        breaker = self.nodes.get(node_id)
+        if breaker is None or breaker.state == CLOSED:
+            return True
+        now = time.monotonic()
+        if breaker.state != CLOSED and now >= breaker.retry_at:
+            breaker.state = HALF_OPEN
+            breaker.retry_at = now + breaker.backoff_s
+            return True
+        breaker.skipped += 1
+        return False
+
+    def bad_quality(self, node_id: str) -> ua.DataValue:
+        breaker = self.nodes[node_id]
+        status = getattr(ua.StatusCodes, breaker.last_status, ua.StatusCodes.BadResourceUnavailable)
+        return ua.DataValue(StatusCode=ua.StatusCode(status))
+
+    def record(self, node_id: str, status: ua.StatusCode):
+        if status.is_bad():
+            self.failure(node_id, status.name)
+        else:
+            self.success(node_id)
+
+    def success(self, node_id: str):
+        breaker = self.nodes.get(node_id)
+        if breaker is None:
+            return
+        breaker.successes += 1
+        if breaker.state != CLOSED:
+            logger.info(f"✅ Disjoncteur refermé {node_id}")
+        breaker.consecutive_failures = 0
+        breaker.state = CLOSED
+        breaker.backoff_s = 0.0
+
+    def failure(self, node_id: str, status: str):
+        breaker = self.nodes.setdefault(node_id, NodeBreaker())
+        breaker.failures += 1
+        breaker.consecutive_failures += 1
+        breaker.last_status = status
+        if breaker.state == HALF_OPEN or breaker.consecutive_failures >= self.threshold:
+            self.trip(node_id)
+            logger.warning(
+                f"⚠️ Disjoncteur ouvert {node_id}: {status} ({breaker.consecutive_failures} échecs), "
+                f"nouvel essai dans {breaker.backoff_s:g}s"
+            )
+
+    def trip(self, node_id: str, status: str = None):
+        breaker = self.nodes.setdefault(node_id, NodeBreaker())
+        if status:
+            breaker.last_status = status
+        breaker.backoff_s = min(breaker.backoff_s * 2 or self.backoff_s, self.max_backoff_s)
+        breaker.retry_at = time.monotonic() + breaker.backoff_s
+        breaker.state = OPEN
+        breaker.trips += 1
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        nodes = {}
+        for node_id, breaker in self.nodes.items():
+            stats = asdict(breaker)
+            stats["retry_in_s"] = round(max(0.0, breaker.retry_at - now), 1) if breaker.state == OPEN else 0.0
+            del stats["retry_at"]
+            nodes[node_id] = stats
+        return {
+            "threshold": self.threshold,
+            "open": sum(breaker.state != CLOSED for breaker in self.nodes.values()),
+            "nodes": nodes,
+        }
@@ -3,6 +3,46 @@ import os
 OFFLINE_MODE = os.getenv("OFFLINE_MODE", "false").lower() == "true"
 OPCUA_SERVER_URL = "opc.tcp://192.168.10.70:4840"
 
+SUBSCRIPTION_CHUNK_SIZE = 100
+KEEPALIVE_S = 2
+RECONNECT_MAX_DELAY_S = 30
+BREAKER_FAILURES = 3
+BREAKER_BACKOFF_S = 5
+BREAKER_MAX_BACKOFF_S = 300
+MAX_PLC_REQUESTS = 4
+REQUEST_DEADLINE_MS = 300
+HISTORY_RETENTION_S = 24 * 3600
+HISTORY_INTERVAL_S = 1.0
+HISTORY_DIR = "history"
+HISTORY_STORE_DAYS = 30
+HISTORY_FLUSH_S = 10
+HISTORY_COMPACT_S = 3600
+
+SCAN_CLASSES = {
+    "fast": 250,
+    "normal": 2000,
+    "slow": 60000,
+}
+DEFAULT_SCAN_CLASS = "normal"
+SSE_KEEPALIVE_S = 15
+SCAN_CLASS_TAGS = {
+    "fast": [
+        "hc1p1_current", "hc1p1_voltage", "hc1p2_current", "hc1p2_voltage",
+        "hc2p3_current", "hc2p3_voltage", "hc2p4_current", "hc2p4_voltage",
+        "evi1_soc", "evi2_soc", "evi3_soc", "evi4_soc",
+        *[f"m{i}_vdc" for i in range(1, 15)],
+        *[f"m{i}_idc" for i in range(1, 15)],
+    ],
+    "slow": [
+        "sys_version", "sys_name", "sw_version",
+    ],
+}
+TEXT_TAGS = [
+    "sys_version", "sys_name", "sw_version",
+    *[f"pdc{i}_status_text" for i in range(1, 5)],
+    *[f"pdc{i}_text_status" for i in range(1, 5)],
+]
+
 VARIABLES = {
     "rio_comflt": "ns=1;s=R1:AMS_OBI_RIO_ComFlt",
     "evi_p1_comok": "ns=1;s=R1:EVI_P1.OBI.ComOk",
@@ -0,0 +1,48 @@
+import numpy as np
+
+
+def bucket_aggregate(timestamps, values, bucket_s: float) -> dict:
+    if not len(timestamps):
+        empty = np.empty(0)
+        return {"timestamps": empty, "min": empty, "max": empty, "avg": empty, "count": empty.astype(np.int64)}
+    buckets = np.floor(timestamps / bucket_s)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    valid = ~np.isnan(values)
+    count = np.add.reduceat(valid.astype(np.int64), starts)
+    total = np.add.reduceat(np.where(valid, values, 0.0), starts)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        avg = np.where(count > 0, total / count, np.nan)
+    return {
+        "timestamps": buckets[starts] * bucket_s,
+        "min": np.fmin.reduceat(values, starts),
+        "max": np.fmax.reduceat(values, starts),
+        "avg": avg,
+        "count": count,
+    }
+
+
+def lttb(timestamps, values, threshold: int):
+    valid = ~np.isnan(values)
+    timestamps, values = timestamps[valid], values[valid]
+    size = len(timestamps)
+    if threshold >= size or threshold < 3:
+        return timestamps, values
+    edges = np.linspace(1, size - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = size - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else size
+        next_t = timestamps[end:next_end].mean() if next_end > end else timestamps[-1]
+        next_v = values[end:next_end].mean() if next_end > end else values[-1]
+        bucket_t = timestamps[start:end]
+        bucket_v = values[start:end]
+        areas = np.abs(
+            (timestamps[previous] - next_t) * (bucket_v - values[previous])
+            - (timestamps[previous] - bucket_t) * (next_v - values[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[i + 1] = previous
+    return timestamps[selected], values[selected]
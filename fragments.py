@@ -0,0 +1,87 @@
+import hashlib
+import html
+from dataclasses import dataclass, replace
+from fastapi.responses import Response
+
+
+@dataclass(frozen=True)
+class Fragment:
+    version: int
+    state: tuple
+    etag: str
+    body: str
+
+
+class FragmentCache:
+    def __init__(self):
+        self.fragments = {}
+
+    def get(self, key: str, snapshot, names, render) -> Fragment:
+        fragment = self.fragments.get(key)
+        if fragment is not None and fragment.version == snapshot.version:
+            return fragment
+        state = tuple((snapshot.values[name], snapshot.quality(name)) for name in names)
+        if fragment is not None and fragment.state == state:
+            fragment = replace(fragment, version=snapshot.version)
+        else:
+            fragment = Fragment(snapshot.version, state, fragment_etag(state), render(snapshot.values))
+        self.fragments[key] = fragment
+        return fragment
+
+
+FRAGMENT_CACHE = FragmentCache()
+
+
+def fragment_etag(state: tuple) -> str:
+    digest = hashlib.blake2b(repr(state).encode(), digest_size=8)
+    return f'"{digest.hexdigest()}"'
+
+
+def fragment_headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+def is_not_modified(request, etag: str) -> bool:
+    if request is None:
+        return False
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=fragment_headers(etag))
+
+
+def degraded_tags(snapshot, names) -> dict:
+    return {name: snapshot.quality(name) for name in names if snapshot.quality(name) != "good"}
+
+
+def quality_detail(snapshot, name: str) -> str:
+    data_value = snapshot.data_values.get(name)
+    if data_value is None:
+        return f"{name}: pas de donnée"
+    timestamp = snapshot.source_timestamp(name)
+    at = f" ({timestamp.astimezone():%d/%m %H:%M:%S})" if timestamp else ""
+    return f"{name}: {data_value.StatusCode.name}{at}"
+
+
+def mark_quality(body: str, snapshot, names) -> str:
+    degraded = degraded_tags(snapshot, names)
+    if not degraded:
+        return body
+    quality = "bad" if "bad" in degraded.values() else "uncertain"
+    title = html.escape("\n".join(quality_detail(snapshot, name) for name in degraded))
+    return f'<div class="quality-{quality}" title="{title}">{body}</div>'
+
+
+def fragment_response(request, snapshot, key: str, names, render, media_type: str = "text/html") -> Response:
+    render_body = render
+    if media_type == "text/html":
+        render_body = lambda values: mark_quality(render(values), snapshot, names)
+    fragment = FRAGMENT_CACHE.get(key, snapshot, names, render_body)
+    if is_not_modified(request, fragment.etag):
+        return not_modified(fragment.etag)
+    return Response(fragment.body, media_type=media_type, headers=fragment_headers(fragment.etag))
@@ -0,0 +1,123 @@
+import asyncio
+import math
+import time
+
+import numpy as np
+from asyncua import ua
+
+from config import HISTORY_RETENTION_S, HISTORY_INTERVAL_S
+from tags import TAGS
+
+LAST_USABLE_STATUSES = {
+    ua.StatusCodes.UncertainLastUsableValue,
+    ua.StatusCodes.UncertainNoCommunicationLastUsableValue,
+}
+
+
+class RingBuffer:
+    def __init__(self, capacity: int):
+        self.timestamps = np.empty(capacity, dtype=np.float64)
+        self.values = np.empty(capacity, dtype=np.float64)
+        self.capacity = capacity
+        self.size = 0
+        self.head = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def first_timestamp(self) -> float:
+        if not self.size:
+            return math.inf
+        return self.timestamps[self.head if self.size == self.capacity else 0]
+
+    @property
+    def last_timestamp(self) -> float:
+        return self.timestamps[self.head - 1] if self.size else -math.inf
+
+    @property
+    def last_value(self) -> float:
+        return self.values[self.head - 1] if self.size else math.nan
+
+    def append(self, timestamp: float, value: float):
+        self.timestamps[self.head] = timestamp
+        self.values[self.head] = value
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def ordered(self):
+        if self.size < self.capacity:
+            return self.timestamps[:self.size], self.values[:self.size]
+        order = np.r_[self.head:self.capacity, 0:self.head]
+        return self.timestamps[order], self.values[order]
+
+    def between(self, start: float, end: float):
+        timestamps, values = self.ordered()
+        first = max(int(np.searchsorted(timestamps, start, side="right")) - 1, 0)
+        last = int(np.searchsorted(timestamps, end, side="right"))
+        return timestamps[first:last], values[first:last]
+
+
+class Historian:
+    def __init__(self, retention_s: float = HISTORY_RETENTION_S, interval_s: float = HISTORY_INTERVAL_S, store=None):
+        self.interval_s = interval_s
+        self.store = store
+        capacity = int(retention_s / interval_s)
+        self.buffers = {
+            tag.name: RingBuffer(capacity)
+            for tag in TAGS.tags.values()
+            if tag.numeric
+        }
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.buffers
+
+    def record(self, data_values: dict, scanned_at: float = None):
+        scanned_at = time.time() if scanned_at is None else scanned_at
+        for name, data_value in data_values.items():
+            buffer = self.buffers.get(name)
+            if buffer is None:
+                continue
+            source_timestamp = data_value.SourceTimestamp or data_value.ServerTimestamp
+            if self._is_gap(data_value.StatusCode, source_timestamp, buffer):
+                if not math.isnan(buffer.last_value) and scanned_at > buffer.last_timestamp:
+                    self._append(name, buffer, scanned_at, math.nan)
+                continue
+            timestamp = source_timestamp.timestamp() if source_timestamp else scanned_at
+            if len(buffer) and math.isnan(buffer.last_value):
+                timestamp = timestamp if timestamp > buffer.last_timestamp else scanned_at
+            elif timestamp < buffer.last_timestamp + self.interval_s:
+                continue
+            try:
+                value = float(data_value.Value.Value)
+            except (TypeError, ValueError):
+                continue
+            self._append(name, buffer, timestamp, value)
+
+    def _is_gap(self, status: ua.StatusCode, source_timestamp, buffer: RingBuffer) -> bool:
+        if status.is_bad() or status.value in LAST_USABLE_STATUSES:
+            return True
+        if not status.is_uncertain():
+            return False
+        return source_timestamp is None or source_timestamp.timestamp() <= buffer.last_timestamp
+
+    def _append(self, name: str, buffer: RingBuffer, timestamp: float, value: float):
+        buffer.append(timestamp, value)
+        if self.store is not None:
+            self.store.append(name, timestamp, value)
+
+    async def query(self, name: str, start: float, end: float):
+        buffer = self.buffers[name]
+        if self.store is None or buffer.first_timestamp <= start:
+            return buffer.between(start, end)
+        timestamps, values = await asyncio.to_thread(self.store.query, name, start, end)
+        after = timestamps[-1] if len(timestamps) else start
+        recent_timestamps, recent_values = buffer.between(after, end)
+        recent = recent_timestamps > after if len(timestamps) else slice(None)
+        return (
+            np.concatenate((timestamps, recent_timestamps[recent])),
+            np.concatenate((values, recent_values[recent])),
+        )
+
+    def memory_bytes(self) -> int:
+        return sum(buffer.timestamps.nbytes + buffer.values.nbytes for buffer in self.buffers.values())
@@ -0,0 +1,181 @@
+import asyncio
+import logging
+import os
+import shutil
+from array import array
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from config import HISTORY_DIR, HISTORY_STORE_DAYS, HISTORY_FLUSH_S, HISTORY_COMPACT_S
+
+logger = logging.getLogger(__name__)
+
+COMPACTED = ".compacted"
+
+
+def day_of(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%d")
+
+
+def days_between(start: float, end: float):
+    day = datetime.fromtimestamp(start, timezone.utc).date()
+    last = datetime.fromtimestamp(end, timezone.utc).date()
+    while day <= last:
+        yield day.isoformat()
+        day += timedelta(days=1)
+
+
+def read_column(path: str, count: int = None):
+    size = os.path.getsize(path) if os.path.exists(path) else 0
+    if size < 8:
+        return np.empty(0)
+    column = np.memmap(path, dtype=np.float64, mode="r", shape=(size // 8,))
+    return column if count is None else column[:count]
+
+
+def collapse_runs(timestamps, values):
+    if not len(timestamps):
+        return timestamps, values
+    order = np.argsort(timestamps, kind="stable")
+    timestamps, values = timestamps[order], values[order]
+    unique = np.append(timestamps[1:] != timestamps[:-1], True)
+    timestamps, values = timestamps[unique], values[unique]
+    same = (values[1:] == values[:-1]) | (np.isnan(values[1:]) & np.isnan(values[:-1]))
+    keep = np.ones(len(values), dtype=bool)
+    keep[1:-1] = ~(same[:-1] & same[1:])
+    return timestamps[keep], values[keep]
+
+
+class HistoryStore:
+    def __init__(self, directory: str = HISTORY_DIR, retention_days: int = HISTORY_STORE_DAYS):
+        self.directory = directory
+        self.retention_days = retention_days
+        self.pending = {}
+        self.last_timestamps = {}
+        self._tasks = []
+        self._lock = asyncio.Lock()
+
+    def paths(self, day: str, name: str):
+        base = os.path.join(self.directory, day, name)
+        return f"{base}.t.f8", f"{base}.v.f8"
+
+    async def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        await asyncio.to_thread(self._recover)
+        self._tasks = [
+            asyncio.create_task(self._run(self.flush, HISTORY_FLUSH_S)),
+            asyncio.create_task(self._run(self.maintain, HISTORY_COMPACT_S)),
+        ]
+        logger.info(f"✅ Historique disque {os.path.abspath(self.directory)} ({self.retention_days} jours)")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.flush()
+
+    async def _run(self, job, period: float):
+        while True:
+            await asyncio.sleep(period)
+            try:
+                await job()
+            except Exception as e:
+                logger.error(f"Erreur historique disque: {e}")
+
+    def _recover(self):
+        for day in sorted(os.listdir(self.directory)):
+            directory = os.path.join(self.directory, day)
+            if not os.path.isdir(directory) or os.path.exists(os.path.join(directory, COMPACTED)):
+                continue
+            for file_name in os.listdir(directory):
+                if not file_name.endswith(".t.f8"):
+                    continue
+                name = file_name.removesuffix(".t.f8")
+                paths = self.paths(day, name)
+                sizes = [os.path.getsize(path) if os.path.exists(path) else 0 for path in paths]
+                records = min(sizes) // 8
+                for path, size in zip(paths, sizes):
+                    if size > records * 8:
+                        os.truncate(path, records * 8)
+                        logger.warning(f"⚠️ Historique {path} tronqué à {records} échantillons")
+                if records:
+                    self.last_timestamps[name] = float(read_column(paths[0], records)[-1])
+
+    def append(self, name: str, timestamp: float, value: float):
+        if timestamp <= self.last_timestamps.get(name, float("-inf")):
+            return
+        self.last_timestamps[name] = timestamp
+        timestamps, values = self.pending.setdefault((day_of(timestamp), name), (array("d"), array("d")))
+        timestamps.append(timestamp)
+        values.append(value)
+
+    async def flush(self):
+        pending, self.pending = self.pending, {}
+        if pending:
+            async with self._lock:
+                await asyncio.to_thread(self._write, pending)
+
+    def _write(self, pending: dict):
+        for (day, name), columns in pending.items():
+            os.makedirs(os.path.join(self.directory, day), exist_ok=True)
+            for path, column in zip(self.paths(day, name), columns):
+                with open(path, "ab") as file:
+                    column.tofile(file)
+
+    def query(self, name: str, start: float, end: float):
+        timestamps = []
+        values = []
+        for day in days_between(start, end):
+            t_path, v_path = self.paths(day, name)
+            day_timestamps = read_column(t_path)
+            day_values = read_column(v_path, len(day_timestamps))
+            day_timestamps = day_timestamps[:len(day_values)]
+            if not len(day_timestamps):
+                continue
+            first = 0
+            if not timestamps:
+                first = max(int(np.searchsorted(day_timestamps, start, side="right")) - 1, 0)
+            last = int(np.searchsorted(day_timestamps, end, side="right"))
+            timestamps.append(np.array(day_timestamps[first:last]))
+            values.append(np.array(day_values[first:last]))
+        if not timestamps:
+            return np.empty(0), np.empty(0)
+        return np.concatenate(timestamps), np.concatenate(values)
+
+    async def maintain(self):
+        async with self._lock:
+            await asyncio.to_thread(self._maintain)
+
+    def _maintain(self):
+        today = day_of(datetime.now(timezone.utc).timestamp())
+        oldest = (datetime.now(timezone.utc) - timedelta(days=self.retention_days)).strftime("%Y-%m-%d")
+        for day in sorted(os.listdir(self.directory)):
+            path = os.path.join(self.directory, day)
+            if not os.path.isdir(path) or day >= today:
+                continue
+            if day < oldest:
+                shutil.rmtree(path)
+                logger.info(f"Historique {day} supprimé (rétention {self.retention_days} jours)")
+            elif not os.path.exists(os.path.join(path, COMPACTED)):
+                self._compact(day)
+
+    def _compact(self, day: str):
+        directory = os.path.join(self.directory, day)
+        before = after = 0
+        for file_name in sorted(os.listdir(directory)):
+            if not file_name.endswith(".t.f8"):
+                continue
+            t_path, v_path = self.paths(day, file_name.removesuffix(".t.f8"))
+            timestamps = np.fromfile(t_path)
+            values = np.fromfile(v_path) if os.path.exists(v_path) else np.empty(0)
+            count = min(len(timestamps), len(values))
+            timestamps, values = collapse_runs(timestamps[:count], values[:count])
+            before += count
+            after += len(timestamps)
+            for path, column in ((t_path, timestamps), (v_path, values)):
+                column.tofile(f"{path}.tmp")
+                os.replace(f"{path}.tmp", path)
+        open(os.path.join(directory, COMPACTED), "w").close()
+        logger.info(f"✅ Historique {day} compacté: {before} → {after} échantillons")
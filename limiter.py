@@ -0,0 +1,37 @@
+import asyncio
+import heapq
+import itertools
+
+from config import MAX_PLC_REQUESTS
+
+COMMAND = 0
+DISPLAY = 1
+
+
+class PriorityLimiter:
+    def __init__(self, limit: int = MAX_PLC_REQUESTS):
+        self.limit = limit
+        self.in_flight = 0
+        self._waiters = []
+        self._order = itertools.count()
+
+    async def acquire(self, priority: int = DISPLAY):
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._order), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.in_flight -= 1
@@ -8,23 +8,36 @@ import logging
 
 from opcua_client import OPCUAClient
 from offline_provider import OfflineProvider
+from acquisition import ScanEngine
+from historian import Historian
+from history_store import HistoryStore
 from config import OPCUA_SERVER_URL, OFFLINE_MODE
-from routers import sequences, exploitation, communication, system, synoptique
+from routers import sequences, exploitation, communication, system, synoptique, ws, history, trends, export
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 opcua_client = None
+scan_engine = None
+historian = None
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global opcua_client
+    global opcua_client, scan_engine, historian
     if OFFLINE_MODE:
         opcua_client = OfflineProvider(OPCUA_SERVER_URL)
     else:
         opcua_client = OPCUAClient(OPCUA_SERVER_URL)
     await opcua_client.connect()
+    history_store = HistoryStore()
+    await history_store.start()
+    historian = Historian(store=history_store)
+    scan_engine = ScanEngine(opcua_client, historian)
+    await scan_engine.start()
     yield
+    await scan_engine.stop()
+    await ws.finish_commands()
+    await history_store.stop()
     await opcua_client.disconnect()
 
 app = FastAPI(lifespan=lifespan)
@@ -37,10 +50,23 @@ app.include_router(exploitation.router)
 app.include_router(communication.router)
 app.include_router(system.router)
 app.include_router(synoptique.router)
+app.include_router(ws.router)
+app.include_router(history.router)
+app.include_router(trends.router)
+app.include_router(export.router)
 
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
     return templates.TemplateResponse("sequences.html", {"request": request})
 
 def get_opcua_client():
-    return opcua_client
\ No newline at end of file
+    return opcua_client
+
+def get_scan_engine():
+    return scan_engine
+
+def get_historian():
+    return historian
+
+def get_snapshot():
+    return scan_engine.snapshot
\ No newline at end of file
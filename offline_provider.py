@@ -1,5 +1,7 @@
 import logging
-from config import VARIABLES, SYNOPTIQUE_VARIABLES
+from datetime import datetime, timezone
+from asyncua import ua
+from tags import TAGS
 from offline_data import get_offline_value, simulate_dynamic_value, OFFLINE_DATA, SYNOPTIQUE_OFFLINE_DATA
 
 logger = logging.getLogger(__name__)
@@ -12,11 +14,10 @@ class OfflineProvider:
         self._init_cache()
 
     def _init_cache(self):
-        all_vars = {**VARIABLES, **SYNOPTIQUE_VARIABLES}
-        for var_name, node_id in all_vars.items():
-            value = get_offline_value(var_name)
+        for tag in TAGS.tags.values():
+            value = get_offline_value(tag.name)
             if value is not None:
-                self.data_cache[node_id] = value
+                self.data_cache[tag.node_id] = value
 
     async def connect(self):
         self.connected = True
@@ -33,7 +34,7 @@ class OfflineProvider:
 
         current_value = self.data_cache[node_id]
 
-        var_name = self._get_var_name(node_id)
+        var_name = TAGS.name(node_id)
         if var_name:
             new_value = simulate_dynamic_value(var_name, current_value)
             self.data_cache[node_id] = new_value
@@ -41,6 +42,18 @@ class OfflineProvider:
 
         return current_value
 
+    async def read_variables(self, node_ids: list, deadline: float = None) -> list:
+        results = []
+        for node_id in node_ids:
+            if node_id not in self.data_cache:
+                logger.warning(f"Variable {node_id} non trouvée en mode offline")
+                results.append(ua.DataValue(StatusCode=ua.StatusCode(ua.StatusCodes.BadNodeIdUnknown)))
+            else:
+                now = datetime.now(timezone.utc)
+                value = ua.Variant(await self.read_variable(node_id))
+                results.append(ua.DataValue(value, SourceTimestamp=now, ServerTimestamp=now))
+        return results
+
     async def write_variable(self, node_id: str, value):
         if node_id in self.data_cache:
             self.data_cache[node_id] = value
@@ -48,9 +61,16 @@ class OfflineProvider:
         else:
             logger.warning(f"🟡 MODE OFFLINE - Variable {node_id} inconnue pour écriture")
 
-    def _get_var_name(self, node_id: str):
-        all_vars = {**VARIABLES, **SYNOPTIQUE_VARIABLES}
-        for var_name, nid in all_vars.items():
-            if nid == node_id:
-                return var_name
-        return None
+    async def write_variables(self, values: dict, deadline: float = None) -> dict:
+        results = {}
+        for node_id, value in values.items():
+            if node_id in self.data_cache:
+                self.data_cache[node_id] = value
+                results[node_id] = ua.StatusCode(ua.StatusCodes.Good)
+            else:
+                logger.warning(f"🟡 MODE OFFLINE - Variable {node_id} inconnue pour écriture")
+                results[node_id] = ua.StatusCode(ua.StatusCodes.BadNodeIdUnknown)
+        written = [f"{n} = {values[n]}" for n, status in results.items() if status.is_good()]
+        if written:
+            logger.info(f"🟡 MODE OFFLINE - Écriture simulée {', '.join(written)}")
+        return results
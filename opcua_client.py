@@ -1,44 +1,429 @@
-from asyncua import Client
+from asyncua import Client, ua
+from asyncua.client.ua_client import UaClientState
+from asyncua.common.ua_utils import data_type_to_variant_type
+from dataclasses import replace
+from datetime import datetime, timezone
+import asyncio
 import logging
 
+from config import SCAN_CLASSES, SUBSCRIPTION_CHUNK_SIZE, KEEPALIVE_S, RECONNECT_MAX_DELAY_S
+from tags import TAGS
+from breaker import CircuitBreaker
+from limiter import PriorityLimiter, COMMAND, DISPLAY
+
 logger = logging.getLogger(__name__)
 
+PENDING = ua.StatusCodes.BadTimeout
+READ_FAILED = ua.StatusCodes.BadCommunicationError
+NOT_SENT = ua.StatusCodes.BadRequestCancelledByClient
+
+NODE_ATTRIBUTES = (ua.AttributeIds.NodeClass, ua.AttributeIds.DataType, ua.AttributeIds.ValueRank)
+
+BUILTIN_VARIANT_TYPES = {variant_type.value: variant_type for variant_type in ua.VariantType}
+
+VARIANT_COERCIONS = {
+    ua.VariantType.Boolean: bool,
+    ua.VariantType.SByte: int,
+    ua.VariantType.Byte: int,
+    ua.VariantType.Int16: int,
+    ua.VariantType.UInt16: int,
+    ua.VariantType.Int32: int,
+    ua.VariantType.UInt32: int,
+    ua.VariantType.Int64: int,
+    ua.VariantType.UInt64: int,
+    ua.VariantType.Float: float,
+    ua.VariantType.Double: float,
+    ua.VariantType.String: str,
+}
+
+class SubscriptionHandler:
+    def __init__(self, cache: dict):
+        self.cache = cache
+
+    def datachange_notification(self, node, val, data):
+        self.cache[node.nodeid.to_string()] = data.monitored_item.Value
+
 class OPCUAClient:
     def __init__(self, url: str):
         self.url = url
         self.client = None
-        self.connected = False
-    
+        self.subscriptions = {}
+        self.cache = {}
+        self.last_read = {}
+        self.max_nodes_per_read = 0
+        self.max_nodes_per_write = 0
+        self.nodes = {}
+        self.read_value_ids = {}
+        self.unknown_nodes = set()
+        self.node_types = {}
+        self.breaker = CircuitBreaker()
+        self._in_flight = {}
+        self._reads = set()
+        self.limiter = PriorityLimiter()
+        self._tasks = []
+
+    @property
+    def connected(self) -> bool:
+        return self.client is not None and self.client.state is UaClientState.CONNECTED
+
     async def connect(self):
         try:
-            self.client = Client(url=self.url)
-            await self.client.connect()
-            self.connected = True
-            logger.info(f"✅ Connecté à {self.url}")
+            await self._open()
         except Exception as e:
-            logger.error(f"❌ Erreur connexion: {e}")
-            raise
-    
+            logger.error(f"❌ Erreur connexion: {e}, nouvelle tentative en arrière-plan")
+            self._tasks.append(asyncio.create_task(self._connect_with_backoff()))
+
+    async def _open(self):
+        self.client = Client(
+            url=self.url,
+            watchdog_intervall=KEEPALIVE_S,
+            auto_reconnect=True,
+            reconnect_max_delay=RECONNECT_MAX_DELAY_S,
+        )
+        await self.client.connect()
+        logger.info(f"✅ Connecté à {self.url}")
+        await self._read_operation_limits()
+        await self._resolve_nodes()
+        await self._subscribe_all()
+        self._tasks.append(asyncio.create_task(self._watch_link()))
+
+    async def _connect_with_backoff(self):
+        delay = 1.0
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self._open()
+                return
+            except Exception as e:
+                delay = min(delay * 2, RECONNECT_MAX_DELAY_S)
+                logger.warning(f"⚠️ Connexion impossible: {e}, nouvel essai dans {delay:.0f}s")
+
+    async def _watch_link(self):
+        lost = False
+        async with self.client.subscribe_state() as states:
+            while True:
+                state = await states.next_change()
+                if state is UaClientState.RECONNECTING and not lost:
+                    lost = True
+                    logger.warning(f"⚠️ Liaison {self.url} perdue, reconnexion (dernières valeurs connues servies)")
+                elif state is UaClientState.CONNECTED and lost:
+                    lost = False
+                    logger.info(f"✅ Liaison {self.url} rétablie")
+
+    def _last_known(self, node_id: str) -> ua.DataValue:
+        data_value = self.cache.get(node_id) or self.last_read.get(node_id)
+        if data_value is None or data_value.StatusCode.is_bad():
+            return ua.DataValue(StatusCode=ua.StatusCode(ua.StatusCodes.BadNotConnected))
+        return replace(data_value, StatusCode=ua.StatusCode(ua.StatusCodes.UncertainLastUsableValue))
+
     async def disconnect(self):
+        tasks = [*self._tasks, *self._reads]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
         if self.client:
-            await self.client.disconnect()
-            self.connected = False
+            if self.connected:
+                for subscription in self.subscriptions.values():
+                    try:
+                        await subscription.delete()
+                    except Exception as e:
+                        logger.warning(f"Erreur suppression abonnement: {e}")
+            self.subscriptions.clear()
+            try:
+                await self.client.disconnect()
+            except Exception as e:
+                logger.warning(f"Erreur déconnexion: {e}")
+            self.cache.clear()
+            self.last_read.clear()
+            self.nodes.clear()
+            self.read_value_ids.clear()
+            self.node_types.clear()
             logger.info("Déconnecté")
-    
+
+    async def _read_operation_limits(self):
+        try:
+            nodes = [
+                self.client.get_node(ua.ObjectIds.Server_ServerCapabilities_OperationLimits_MaxNodesPerRead),
+                self.client.get_node(ua.ObjectIds.Server_ServerCapabilities_OperationLimits_MaxNodesPerWrite),
+            ]
+            max_read, max_write = await self.client.read_values(nodes)
+            self.max_nodes_per_read = max_read or 0
+            self.max_nodes_per_write = max_write or 0
+        except Exception as e:
+            logger.warning(f"Limites MaxNodesPerRead/Write indisponibles: {e}")
+            self.max_nodes_per_read = 0
+            self.max_nodes_per_write = 0
+
+    async def _resolve_nodes(self):
+        node_ids = list(TAGS.by_node_id)
+        self.nodes = {node_id: self.client.get_node(TAGS.ua_node_id(node_id)) for node_id in node_ids}
+        self.read_value_ids = {}
+        for node_id in node_ids:
+            read_value_id = ua.ReadValueId()
+            read_value_id.NodeId = TAGS.ua_node_id(node_id)
+            read_value_id.AttributeId = ua.AttributeIds.Value
+            self.read_value_ids[node_id] = read_value_id
+
+        self.unknown_nodes = set()
+        self.node_types = {}
+        reads = [(node_id, attribute) for node_id in node_ids for attribute in NODE_ATTRIBUTES]
+        attributes = {}
+        chunk_size = self.max_nodes_per_read or len(reads)
+        try:
+            for start in range(0, len(reads), chunk_size):
+                chunk = reads[start:start + chunk_size]
+                params = ua.ReadParameters()
+                for node_id, attribute in chunk:
+                    read_value_id = ua.ReadValueId()
+                    read_value_id.NodeId = TAGS.ua_node_id(node_id)
+                    read_value_id.AttributeId = attribute
+                    params.NodesToRead.append(read_value_id)
+                attributes.update(zip(chunk, await self.client.uaclient.read(params)))
+        except Exception as e:
+            logger.error(f"❌ Erreur validation des nœuds: {e}")
+            return
+
+        variant_types = {}
+        for node_id in node_ids:
+            node_class = attributes[(node_id, ua.AttributeIds.NodeClass)]
+            if not node_class.StatusCode.is_good():
+                self.unknown_nodes.add(node_id)
+                self.breaker.trip(node_id, node_class.StatusCode.name)
+                variants = [other for other in TAGS.case_variants(node_id) if other not in self.unknown_nodes]
+                hint = f" (casse différente de {', '.join(variants)})" if variants else ""
+                logger.warning(f"⚠️ Nœud inconnu {node_id}: {node_class.StatusCode.name}{hint}")
+                continue
+            data_type = attributes[(node_id, ua.AttributeIds.DataType)]
+            value_rank = attributes[(node_id, ua.AttributeIds.ValueRank)]
+            if not data_type.StatusCode.is_good():
+                continue
+            data_type = data_type.Value.Value
+            if data_type not in variant_types:
+                variant_types[data_type] = await self._variant_type(data_type)
+            if variant_types[data_type] is not None:
+                rank = value_rank.Value.Value if value_rank.StatusCode.is_good() else -1
+                self.node_types[node_id] = (variant_types[data_type], rank)
+        logger.info(
+            f"✅ {len(node_ids) - len(self.unknown_nodes)}/{len(node_ids)} nœuds résolus, "
+            f"{len(self.node_types)} types connus"
+        )
+
+    async def _variant_type(self, data_type: ua.NodeId):
+        variant_type = BUILTIN_VARIANT_TYPES.get(data_type.Identifier) if data_type.NamespaceIndex == 0 else None
+        if variant_type is None:
+            try:
+                variant_type = await data_type_to_variant_type(self.client.get_node(data_type))
+            except Exception as e:
+                logger.warning(f"⚠️ Type {data_type.to_string()} non résolu: {e}")
+                return None
+        if variant_type in (ua.VariantType.Null, ua.VariantType.Variant):
+            return None
+        return variant_type
+
+    def _variant(self, node_id: str, value) -> ua.Variant:
+        node_type = self.node_types.get(node_id)
+        if node_type is None:
+            return ua.Variant(value)
+        variant_type, value_rank = node_type
+        coerce = VARIANT_COERCIONS.get(variant_type)
+        if coerce is not None:
+            value = [coerce(item) for item in value] if value_rank >= 1 else coerce(value)
+        return ua.Variant(value, variant_type)
+
+    async def _subscribe_all(self):
+        subscribed = set()
+        failed = 0
+        for scan_class, tags in TAGS.by_scan_class.items():
+            period = SCAN_CLASSES[scan_class]
+            node_ids = [
+                node_id for node_id in dict.fromkeys(tag.node_id for tag in tags)
+                if node_id not in subscribed and node_id not in self.unknown_nodes
+            ]
+            subscribed.update(node_ids)
+            try:
+                subscription = await self.client.create_subscription(period, SubscriptionHandler(self.cache))
+                self.subscriptions[scan_class] = subscription
+                for start in range(0, len(node_ids), SUBSCRIPTION_CHUNK_SIZE):
+                    chunk = node_ids[start:start + SUBSCRIPTION_CHUNK_SIZE]
+                    nodes = [self.nodes[node_id] for node_id in chunk]
+                    handles = await subscription.subscribe_data_change(nodes, sampling_interval=period)
+                    for node_id, handle in zip(chunk, handles):
+                        if isinstance(handle, ua.StatusCode):
+                            failed += 1
+                            logger.warning(f"⚠️ Abonnement impossible {node_id}: {handle.name}")
+            except Exception as e:
+                logger.error(f"❌ Erreur abonnement {scan_class}, lecture directe: {e}")
+        logger.info(f"✅ Abonnement à {len(subscribed) - failed}/{len(subscribed)} variables")
+
     async def read_variable(self, node_id: str):
+        if not self.connected:
+            raise ConnectionError(f"{self.url} non connecté")
+        cached = self.cache.get(node_id)
+        if cached is not None and cached.StatusCode.is_good():
+            return cached.Value.Value
         try:
-            node = self.client.get_node(node_id)
-            value = await node.read_value()
-            return value
+            data_value = (await self._read_shared([node_id], COMMAND))[node_id]
+            data_value.StatusCode.check()
+            return data_value.Value.Value
         except Exception as e:
             logger.error(f"Erreur lecture {node_id}: {e}")
             raise
-    
+
+    async def read_variables(self, node_ids: list, deadline: float = None) -> list:
+        if not self.connected:
+            return [self._last_known(node_id) for node_id in node_ids]
+        results = [self.cache.get(node_id) for node_id in node_ids]
+        missing = []
+        for i, result in enumerate(results):
+            if result is not None:
+                continue
+            if self.breaker.allow(node_ids[i]):
+                missing.append(i)
+            else:
+                results[i] = self.breaker.bad_quality(node_ids[i])
+        if not missing:
+            return results
+        data_values = await self._read_shared([node_ids[i] for i in missing], deadline=deadline)
+        for i in missing:
+            results[i] = data_values[node_ids[i]]
+        return results
+
+    async def _read_shared(self, node_ids: list, priority: int = DISPLAY, deadline: float = None) -> dict:
+        shared = {
+            node_id: self._in_flight[node_id][0] for node_id in node_ids
+            if node_id in self._in_flight and self._in_flight[node_id][1] <= priority
+        }
+        owned = [node_id for node_id in dict.fromkeys(node_ids) if node_id not in shared]
+        loop = asyncio.get_running_loop()
+        futures = {node_id: loop.create_future() for node_id in owned}
+        self._in_flight.update({node_id: (future, priority) for node_id, future in futures.items()})
+        read = asyncio.create_task(self._read_batch(futures, priority)) if futures else None
+        if read is not None:
+            self._reads.add(read)
+            read.add_done_callback(self._reads.discard)
+        waiting = {**shared, **futures}
+        await asyncio.wait(waiting.values(), timeout=deadline)
+        data_values = {}
+        for node_id, future in waiting.items():
+            if future.done() and not future.cancelled():
+                data_values[node_id] = future.result()
+            else:
+                data_values[node_id] = ua.DataValue(StatusCode=ua.StatusCode(PENDING))
+        return data_values
+
+    async def _read_batch(self, futures: dict, priority: int):
+        node_ids = list(futures)
+        chunk_size = self.max_nodes_per_read or len(node_ids)
+        try:
+            await asyncio.gather(*(
+                self._read_chunk(node_ids[start:start + chunk_size], futures, priority)
+                for start in range(0, len(node_ids), chunk_size)
+            ))
+        finally:
+            for node_id, future in futures.items():
+                if not future.done():
+                    self.breaker.failure(node_id, ua.StatusCode(PENDING).name)
+                future.cancel()
+                self._settled(node_id, future)
+
+    async def _read_chunk(self, node_ids: list, futures: dict, priority: int):
+        params = ua.ReadParameters()
+        params.TimestampsToReturn = ua.TimestampsToReturn.Both
+        for node_id in node_ids:
+            read_value_id = self.read_value_ids.get(node_id)
+            if read_value_id is None:
+                read_value_id = ua.ReadValueId()
+                read_value_id.NodeId = TAGS.ua_node_id(node_id)
+                read_value_id.AttributeId = ua.AttributeIds.Value
+            params.NodesToRead.append(read_value_id)
+        try:
+            data_values = await self._request(self.client.uaclient.read, params, priority)
+        except Exception as e:
+            logger.error(f"Erreur lecture groupée ({len(node_ids)} variables): {e}")
+            for node_id in node_ids:
+                self.breaker.failure(node_id, ua.StatusCode(READ_FAILED).name)
+                futures[node_id].set_result(ua.DataValue(StatusCode=ua.StatusCode(READ_FAILED)))
+                self._settled(node_id, futures[node_id])
+            return
+        for node_id, data_value in zip(node_ids, data_values):
+            self.breaker.record(node_id, data_value.StatusCode)
+            self.last_read[node_id] = data_value
+            futures[node_id].set_result(data_value)
+            self._settled(node_id, futures[node_id])
+
+    def _settled(self, node_id: str, future: asyncio.Future):
+        if self._in_flight.get(node_id, (None,))[0] is future:
+            del self._in_flight[node_id]
+
+    async def _request(self, service, params, priority: int):
+        return await asyncio.shield(await self._send(service, params, priority))
+
+    async def _send(self, service, params, priority: int, timeout: float = None) -> asyncio.Future:
+        await asyncio.wait_for(self.limiter.acquire(priority), timeout)
+        request = asyncio.ensure_future(service(params))
+        request.add_done_callback(self._release)
+        return request
+
+    def _release(self, request: asyncio.Future):
+        self.limiter.release()
+        if not request.cancelled():
+            request.exception()
+
     async def write_variable(self, node_id: str, value):
+        status = (await self.write_variables({node_id: value}))[node_id]
+        status.check()
+
+    async def write_variables(self, values: dict, deadline: float = None) -> dict:
+        node_ids = list(values)
+        if not self.connected:
+            logger.error(f"Erreur écriture {', '.join(node_ids)}: {self.url} non connecté")
+            return {node_id: ua.StatusCode(ua.StatusCodes.BadNotConnected) for node_id in node_ids}
+        statuses = []
+        chunk_size = self.max_nodes_per_write or len(node_ids) or 1
+        expires = None if deadline is None else asyncio.get_running_loop().time() + deadline
         try:
-            node = self.client.get_node(node_id)
-            await node.write_value(value)
-            logger.info(f"✅ Écriture {node_id} = {value}")
+            variants = {node_id: self._variant(node_id, value) for node_id, value in values.items()}
+            for start in range(0, len(node_ids), chunk_size):
+                params = ua.WriteParameters()
+                for node_id in node_ids[start:start + chunk_size]:
+                    write_value = ua.WriteValue()
+                    write_value.NodeId = TAGS.ua_node_id(node_id)
+                    write_value.AttributeId = ua.AttributeIds.Value
+                    write_value.Value = ua.DataValue(variants[node_id])
+                    params.NodesToWrite.append(write_value)
+                statuses.extend(await self._write_chunk(params, expires))
         except Exception as e:
-            logger.error(f"Erreur écriture {node_id}: {e}")
-            raise
\ No newline at end of file
+            logger.error(f"Erreur écriture {', '.join(node_ids)}: {e}")
+            raise
+
+        results = dict(zip(node_ids, statuses))
+        written = []
+        for node_id, status in results.items():
+            if status.value == PENDING:
+                logger.warning(f"⚠️ Écriture {node_id} envoyée, sans réponse dans le délai")
+                continue
+            if not status.is_good():
+                logger.error(f"Erreur écriture {node_id}: {status.name}")
+                continue
+            if node_id in self.cache:
+                now = datetime.now(timezone.utc)
+                self.cache[node_id] = ua.DataValue(variants[node_id], SourceTimestamp=now, ServerTimestamp=now)
+            written.append(f"{node_id} = {values[node_id]}")
+        if written:
+            logger.info(f"✅ Écriture {', '.join(written)}")
+        return results
+
+    async def _write_chunk(self, params: ua.WriteParameters, expires: float = None) -> list:
+        loop = asyncio.get_running_loop()
+        count = len(params.NodesToWrite)
+        try:
+            timeout = None if expires is None else expires - loop.time()
+            request = await self._send(self.client.uaclient.write, params, COMMAND, timeout)
+        except TimeoutError:
+            return [ua.StatusCode(NOT_SENT)] * count
+        timeout = None if expires is None else expires - loop.time()
+        done, _ = await asyncio.wait({request}, timeout=timeout)
+        if not done:
+            return [ua.StatusCode(PENDING)] * count
+        return request.result()
@@ -1,4 +1,8 @@
 from . import sequences
 from . import exploitation
 from . import communication
-from . import system
\ No newline at end of file
+from . import system
+from . import ws
+from . import history
+from . import trends
+from . import export
\ No newline at end of file
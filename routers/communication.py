@@ -1,75 +1,81 @@
+import json
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import HTMLResponse, JSONResponse
 from starlette.requests import Request
 from fastapi.templating import Jinja2Templates
-from config import VARIABLES
+from fragments import fragment_response
 
 router = APIRouter()
 templates = Jinja2Templates(directory="templates")
 
+COMM_TAGS = {
+    "RIO": "rio_comflt",
+    "BESS": "bess_comflt",
+    "JBOX": "jbox",
+    "HMI Service - PDC1/2": "hmi_service_12",
+    "CS Service - PDC1/2": "cs_service_12",
+    "HMI Service - PDC3/4": "hmi_service_34",
+    "CS Service - PDC3/4": "cs_service_34",
+    "EVI - PDC1": "evi_p1_comok",
+    "EVI - PDC2": "evi_p2_comok",
+    "EVI - PDC3": "evi_p3_comok",
+    "EVI - PDC4": "evi_p4_comok",
+    "DCBM 1": "dcbm1_comflt",
+    "DCBM 2": "dcbm2_comflt",
+    "DCBM 3": "dcbm3_comflt",
+    "DCBM 4": "dcbm4_comflt",
+}
+
+MODULE_TAGS = [f"mxrx_{i}_com" for i in range(1, 15)]
+
 @router.get("/communication", response_class=HTMLResponse)
 async def communication_page(request: Request):
     return templates.TemplateResponse("communication.html", {"request": request})
 
+def render_communication(values):
+    comm_vars = {label: values[name] for label, name in COMM_TAGS.items()}
+    
+    inverted_logic = ["EVI - PDC1", "EVI - PDC2", "EVI - PDC3", "EVI - PDC4"]
+    
+    html = ""
+    for label, value in comm_vars.items():
+        if label in inverted_logic:
+            status_class = "success" if value else "danger"
+        else:
+            status_class = "danger" if value else "success"
+        
+        html += f"""
+        <div class="comm-item">
+            <span class="comm-label">{label}</span>
+            <span class="indicator {status_class}"></span>
+        </div>
+        """
+    
+    return html
+
 @router.get("/api/communication")
-async def get_communication():
+async def get_communication(request: Request = None):
     try:
-        from main import get_opcua_client
-        opcua_client = get_opcua_client()
-        
-        comm_vars = {
-            "RIO": await opcua_client.read_variable(VARIABLES["rio_comflt"]),
-            "BESS": await opcua_client.read_variable(VARIABLES["bess_comflt"]), 
-            "JBOX": await opcua_client.read_variable(VARIABLES["jbox"]),
-            "HMI Service - PDC1/2": await opcua_client.read_variable(VARIABLES["hmi_service_12"]),
-            "CS Service - PDC1/2": await opcua_client.read_variable(VARIABLES["cs_service_12"]),
-            "HMI Service - PDC3/4": await opcua_client.read_variable(VARIABLES["hmi_service_34"]),
-            "CS Service - PDC3/4": await opcua_client.read_variable(VARIABLES["cs_service_34"]),
-            "EVI - PDC1": await opcua_client.read_variable(VARIABLES["evi_p1_comok"]),
-            "EVI - PDC2": await opcua_client.read_variable(VARIABLES["evi_p2_comok"]),
-            "EVI - PDC3": await opcua_client.read_variable(VARIABLES["evi_p3_comok"]),
-            "EVI - PDC4": await opcua_client.read_variable(VARIABLES["evi_p4_comok"]),
-            "DCBM 1": await opcua_client.read_variable(VARIABLES["dcbm1_comflt"]),
-            "DCBM 2": await opcua_client.read_variable(VARIABLES["dcbm2_comflt"]),
-            "DCBM 3": await opcua_client.read_variable(VARIABLES["dcbm3_comflt"]),
-            "DCBM 4": await opcua_client.read_variable(VARIABLES["dcbm4_comflt"]),
-        }
-        
-        inverted_logic = ["EVI - PDC1", "EVI - PDC2", "EVI - PDC3", "EVI - PDC4"]
-        
-        html = ""
-        for label, value in comm_vars.items():
-            if label in inverted_logic:
-                status_class = "success" if value else "danger"
-            else:
-                status_class = "danger" if value else "success"
-            
-            html += f"""
-            <div class="comm-item">
-                <span class="comm-label">{label}</span>
-                <span class="indicator {status_class}"></span>
-            </div>
-            """
-        
-        return HTMLResponse(html)
+        from main import get_snapshot
+        return fragment_response(request, get_snapshot(), "communication", COMM_TAGS.values(), render_communication)
     except Exception as e:
         return HTMLResponse(f'<div class="comm-item"><span class="comm-label">Error: {str(e)}</span></div>')
 
+def render_modules(values):
+    modules = {}
+    for i, name in enumerate(MODULE_TAGS, start=1):
+        value = values[name]
+        modules[f"M{i}"] = {
+            "fault": bool(value),
+            "color": "#22c55e" if value else "#ef4444"
+        }
+    
+    return json.dumps({"modules": modules})
+
 @router.get("/api/communication/modules")
-async def get_modules_status():
+async def get_modules_status(request: Request = None):
     try:
-        from main import get_opcua_client
-        opcua_client = get_opcua_client()
-        
-        modules = {}
-        for i in range(1, 15):
-            value = await opcua_client.read_variable(VARIABLES[f"mxrx_{i}_com"])
-            modules[f"M{i}"] = {
-                "fault": bool(value),
-                "color": "#22c55e" if value else "#ef4444"
-            }
-        
-        return {"modules": modules}
-        
+        from main import get_snapshot
+        return fragment_response(request, get_snapshot(), "modules", MODULE_TAGS, render_modules, media_type="application/json")
     except Exception as e:
         return {"error": str(e)}
\ No newline at end of file
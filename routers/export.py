@@ -0,0 +1,145 @@
+import asyncio
+import io
+import time
+from datetime import datetime, timezone
+from typing import Literal, Optional
+
+import numpy as np
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from history_store import day_of, days_between
+from routers.history import DEFAULT_WINDOW_S
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+router = APIRouter()
+
+EXPORT_BLOCK_ROWS = 50000
+
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "parquet": "application/vnd.apache.parquet"}
+
+
+def day_bounds(day: str, start: float, end: float):
+    day_start = datetime.fromisoformat(day).replace(tzinfo=timezone.utc).timestamp()
+    return max(day_start, start), min(day_start + 86400, end)
+
+
+def merge_samples(samples, start: float, end: float, closed: bool):
+    timestamps, tags, values = [], [], []
+    for index, (tag_timestamps, tag_values) in enumerate(samples):
+        keep = (tag_timestamps >= start) & (tag_timestamps <= end if closed else tag_timestamps < end)
+        timestamps.append(tag_timestamps[keep])
+        values.append(tag_values[keep])
+        tags.append(np.full(int(keep.sum()), index, dtype=np.int32))
+    timestamps = np.concatenate(timestamps)
+    order = np.argsort(timestamps, kind="stable")
+    return timestamps[order], np.concatenate(tags)[order], np.concatenate(values)[order]
+
+
+async def export_chunks(historian, names: list, start: float, end: float):
+    for day in days_between(start, end):
+        chunk_start, chunk_end = day_bounds(day, start, end)
+        if chunk_start >= chunk_end:
+            continue
+        samples = await asyncio.gather(*(historian.query(name, chunk_start, chunk_end) for name in names))
+        yield await asyncio.to_thread(merge_samples, samples, chunk_start, chunk_end, chunk_end == end)
+
+
+def milliseconds(timestamps):
+    return np.rint(timestamps * 1000).astype(np.int64)
+
+
+def csv_block(names: list, timestamps, tags, values) -> bytes:
+    stamps = np.datetime_as_string(milliseconds(timestamps).astype("datetime64[ms]"), unit="ms", timezone="UTC")
+    return "".join(
+        f"{stamp},{names[tag]},{'' if value != value else repr(value)}\n"
+        for stamp, tag, value in zip(stamps.tolist(), tags.tolist(), values.tolist())
+    ).encode()
+
+
+async def csv_stream(historian, names: list, start: float, end: float):
+    yield b"timestamp,tag,value\n"
+    async for timestamps, tags, values in export_chunks(historian, names, start, end):
+        for first in range(0, len(timestamps), EXPORT_BLOCK_ROWS):
+            block = slice(first, first + EXPORT_BLOCK_ROWS)
+            yield await asyncio.to_thread(csv_block, names, timestamps[block], tags[block], values[block])
+
+
+class ParquetSink(io.RawIOBase):
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self) -> bytes:
+        data, self.chunks = b"".join(self.chunks), []
+        return data
+
+
+def parquet_table(names: list, timestamps, tags, values):
+    return pa.table({
+        "timestamp": pa.array(milliseconds(timestamps), pa.timestamp("ms", tz="UTC")),
+        "tag": pa.DictionaryArray.from_arrays(pa.array(tags, pa.int32()), pa.array(names, pa.string())),
+        "value": pa.array(values, pa.float64(), mask=np.isnan(values)),
+    })
+
+
+async def parquet_stream(historian, names: list, start: float, end: float):
+    sink = ParquetSink()
+    empty = parquet_table(names, np.empty(0), np.empty(0, dtype=np.int32), np.empty(0))
+    writer = pq.ParquetWriter(sink, empty.schema)
+    try:
+        async for timestamps, tags, values in export_chunks(historian, names, start, end):
+            if not len(timestamps):
+                continue
+            table = await asyncio.to_thread(parquet_table, names, timestamps, tags, values)
+            await asyncio.to_thread(writer.write_table, table, EXPORT_BLOCK_ROWS)
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+@router.get("/api/export")
+async def export_history(
+    tags: str,
+    start: Optional[float] = Query(None, alias="from"),
+    end: Optional[float] = Query(None, alias="to"),
+    format: Literal["csv", "parquet"] = "csv",
+):
+    from main import get_historian
+    historian = get_historian()
+    names = list(dict.fromkeys(name for name in tags.split(",") if name))
+    unknown = [name for name in names if name not in historian]
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Sans historique: {', '.join(unknown)}")
+    if not names:
+        raise HTTPException(status_code=400, detail="Aucun tag demandé")
+    if format == "parquet" and pq is None:
+        raise HTTPException(status_code=501, detail="Export parquet indisponible: pyarrow non installé")
+    end = time.time() if end is None else end
+    start = end - DEFAULT_WINDOW_S if start is None else start
+    if start >= end:
+        raise HTTPException(status_code=400, detail="from doit précéder to")
+    stream = parquet_stream if format == "parquet" else csv_stream
+    filename = f"historique_{day_of(start)}_{day_of(end)}.{format}"
+    return StreamingResponse(
+        stream(historian, names, start, end),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,64 @@
+import asyncio
+import math
+import time
+from typing import Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import JSONResponse
+
+from downsampling import bucket_aggregate, lttb
+
+router = APIRouter()
+
+DEFAULT_WINDOW_S = 3600
+
+
+def json_floats(values) -> list:
+    return [None if math.isnan(value) else value for value in values.tolist()]
+
+
+def history_payload(timestamps, values, tag: str, start: float, end: float, max_points, bucket, method) -> dict:
+    payload = {"tag": tag, "from": start, "to": end, "samples": len(timestamps)}
+    if method == "lttb" and max_points and len(timestamps) > max_points:
+        timestamps, values = lttb(timestamps, values, max_points)
+    elif bucket or (max_points and len(timestamps) > max_points):
+        bucket_s = bucket or (end - start) / (max_points - 1)
+        aggregated = bucket_aggregate(timestamps, values, bucket_s)
+        payload.update(
+            bucket=bucket_s,
+            timestamps=aggregated["timestamps"].tolist(),
+            min=json_floats(aggregated["min"]),
+            max=json_floats(aggregated["max"]),
+            avg=json_floats(aggregated["avg"]),
+            count=aggregated["count"].tolist(),
+        )
+        return payload
+    payload.update(timestamps=timestamps.tolist(), values=json_floats(values))
+    return payload
+
+
+@router.get("/api/history/{tag}")
+async def get_history(
+    tag: str,
+    start: Optional[float] = Query(None, alias="from"),
+    end: Optional[float] = Query(None, alias="to"),
+    max_points: Optional[int] = Query(None, ge=3),
+    bucket: Optional[float] = Query(None, gt=0),
+    method: Literal["minmax", "lttb"] = "minmax",
+):
+    from main import get_historian
+    historian = get_historian()
+    if tag not in historian:
+        raise HTTPException(status_code=404, detail=f"{tag} sans historique")
+    end = time.time() if end is None else end
+    start = end - DEFAULT_WINDOW_S if start is None else start
+    if start > end:
+        raise HTTPException(status_code=400, detail="from doit précéder to")
+    try:
+        timestamps, values = await historian.query(tag, start, end)
+        payload = await asyncio.to_thread(
+            history_payload, timestamps, values, tag, start, end, max_points, bucket, method
+        )
+        return JSONResponse(payload)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
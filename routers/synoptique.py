@@ -1,9 +1,15 @@
+import asyncio
+import json
+from dataclasses import replace
+from typing import Optional
+
 from fastapi import APIRouter
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from starlette.requests import Request
 from fastapi.templating import Jinja2Templates
 
-from config import SYNOPTIQUE_VARIABLES
+from config import SYNOPTIQUE_VARIABLES, SSE_KEEPALIVE_S
+from fragments import degraded_tags
 from routers.synoptique_config import MODULES, POLE_GROUPES, CONTACTEURS_KM, PDC_STATUS_LIST
 
 router = APIRouter()
@@ -169,83 +175,132 @@ async def synoptique_page(request: Request):
     return templates.TemplateResponse("synoptique.html", {"request": request})
 
 
-async def load_data() -> dict:
-    from main import get_opcua_client
-    import asyncio
+def load_data(snapshot) -> dict:
+    data = {key: snapshot.get(key, 0) for key in SYNOPTIQUE_VARIABLES}
+    for i in range(1, 11):
+        data[f"pg{i}_color_id"] = snapshot.get(f"pg{i}_color_id", -1)
+    for i in range(1, 5):
+        data[f"pdc{i}_text_status"] = snapshot.get(f"pdc{i}_text_status", "")
+    return data
+
+
+def compute_synoptique(snapshot) -> dict:
+    data = load_data(snapshot)
+    
+    result = {}
     
-    opcua = get_opcua_client()
+    for i in range(1, 15):
+        m = replace(
+            MODULES[f"M{i}"],
+            vdc=data[f"m{i}_vdc"],
+            idc=data[f"m{i}_idc"],
+            status=data[f"m{i}_status"],
+        )
+        result[f"M{i}"] = {
+            "vdc": round(m.vdc, 0),
+            "idc": round(m.idc, 0),
+            "status": m.status,
+            "module_color": module_status_color(m.status),
+        }
+    
+    for i in range(1, 11):
+        pg = replace(
+            POLE_GROUPES[f"G{i}"],
+            status=data[f"pg{i}_status"],
+            color_id=data[f"pg{i}_color_id"],
+            id_prise=data[f"pg{i}_id_prise"],
+        )
+        result[f"G{i}"] = {
+            "status": pg.status,
+            "status_color": status_color(pg.status),
+            "bg_color": pole_groupe_status_color(pg.status),
+        }
     
-    tasks = {key: opcua.read_variable(node_id) for key, node_id in SYNOPTIQUE_VARIABLES.items()}
-    results = await asyncio.gather(*tasks.values(), return_exceptions=True)
+    for i in range(1, 13):
+        km = replace(CONTACTEURS_KM[f"K{i}"], status=data[f"km{i}_status"])
+        result[f"K{i}"] = contacteur_state(km.status)
     
-    data = {}
-    for key, result in zip(tasks.keys(), results):
-        if isinstance(result, Exception):
-            data[key] = 0
-        else:
-            data[key] = result
+    for i in range(1, 5):
+        kp_status = data.get(f"p{i}_status", 0)
+        result[f"KP{i}"] = contacteur_kp_state(kp_status)
+    
+    for i in range(1, 5):
+        pdc = replace(
+            PDC_STATUS_LIST[f"PDC{i}"],
+            color_status=data[f"pdc{i}_color_status"],
+            text_status=data[f"pdc{i}_text_status"],
+        )
+        result[f"PDC{i}"] = pdc_state(pdc.color_status, pdc.text_status)
 
-    for i in range(1, 15):
-        m = MODULES[f"M{i}"]
-        m.vdc = data.get(f"m{i}_vdc", 0.0)
-        m.idc = data.get(f"m{i}_idc", 0.0)
-        m.status = data.get(f"m{i}_status", 0)
+    degraded = degraded_tags(snapshot, SYNOPTIQUE_VARIABLES)
+    result["quality"] = "bad" if "bad" in degraded.values() else "uncertain" if degraded else "good"
+    
+    return result
 
-    for i in range(1, 11):
-        pg = POLE_GROUPES[f"G{i}"]
-        pg.status = data.get(f"pg{i}_status", 0)
-        pg.color_id = data.get(f"pg{i}_color_id", -1)
-        pg.id_prise = data.get(f"pg{i}_id_prise", 0)
 
-    for i in range(1, 13):
-        km = CONTACTEURS_KM[f"K{i}"]
-        km.status = data.get(f"km{i}_status", 0)
+class SynoptiqueChangeLog:
+    def __init__(self):
+        self.version = -1
+        self.state = {}
+        self.changed_at = {}
 
-    for i in range(1, 5):
-        pdc = PDC_STATUS_LIST[f"PDC{i}"]
-        pdc.color_status = data.get(f"pdc{i}_color_status", 0)
-        pdc.text_status = data.get(f"pdc{i}_text_status", "")
+    def update(self, snapshot) -> dict:
+        if snapshot.version > self.version:
+            state = compute_synoptique(snapshot)
+            for key, value in state.items():
+                if self.state.get(key) != value:
+                    self.changed_at[key] = snapshot.version
+            self.state = state
+            self.version = snapshot.version
+        return self.state
+
+    def changed_since(self, version: int) -> dict:
+        if version > self.version:
+            return dict(self.state)
+        return {key: self.state[key] for key, changed in self.changed_at.items() if changed > version}
 
-    return data
+
+CHANGE_LOG = SynoptiqueChangeLog()
 
 
 @router.get("/api/synoptique/data")
-async def get_synoptique_data():
+async def get_synoptique_data(since: Optional[int] = None):
     try:
-        data = await load_data()
-        
-        result = {}
-        
-        for i in range(1, 15):
-            m = MODULES[f"M{i}"]
-            result[f"M{i}"] = {
-                "vdc": round(m.vdc, 0),
-                "idc": round(m.idc, 0),
-                "status": m.status,
-                "module_color": module_status_color(m.status),
-            }
-        
-        for i in range(1, 11):
-            pg = POLE_GROUPES[f"G{i}"]
-            result[f"G{i}"] = {
-                "status": pg.status,
-                "status_color": status_color(pg.status),
-                "bg_color": pole_groupe_status_color(pg.status),
-            }
-        
-        for i in range(1, 13):
-            km = CONTACTEURS_KM[f"K{i}"]
-            result[f"K{i}"] = contacteur_state(km.status)
-        
-        for i in range(1, 5):
-            kp_status = data.get(f"p{i}_status", 0)
-            result[f"KP{i}"] = contacteur_kp_state(kp_status)
-        
-        for i in range(1, 5):
-            pdc = PDC_STATUS_LIST[f"PDC{i}"]
-            result[f"PDC{i}"] = pdc_state(pdc.color_status, pdc.text_status)
-        
-        return JSONResponse(result)
+        from main import get_snapshot
+        state = CHANGE_LOG.update(get_snapshot())
+        headers = {"X-Synoptique-Version": str(CHANGE_LOG.version)}
+        if since is None:
+            return JSONResponse(state, headers=headers)
+
+        changed = CHANGE_LOG.changed_since(since)
+        if not changed:
+            return Response(status_code=304, headers=headers)
+        return JSONResponse({"version": CHANGE_LOG.version, "elements": changed}, headers=headers)
     
     except Exception as e:
-        return JSONResponse({"error": str(e)}, status_code=500)
\ No newline at end of file
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+
+@router.get("/api/synoptique/stream")
+async def stream_synoptique():
+    from main import get_scan_engine
+    engine = get_scan_engine()
+
+    async def events():
+        snapshot = engine.snapshot
+        state = CHANGE_LOG.update(snapshot)
+        version = CHANGE_LOG.version
+        yield f"id: {version}\ndata: {json.dumps(state)}\n\n"
+        while True:
+            try:
+                snapshot = await asyncio.wait_for(engine.wait_for_update(snapshot.version), SSE_KEEPALIVE_S)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            CHANGE_LOG.update(snapshot)
+            changed = CHANGE_LOG.changed_since(version)
+            version = CHANGE_LOG.version
+            if changed:
+                yield f"id: {version}\ndata: {json.dumps(changed)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
@@ -1,47 +1,59 @@
 import asyncio
 from fastapi import APIRouter, HTTPException, BackgroundTasks
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse
 from starlette.requests import Request
 from fastapi.templating import Jinja2Templates
-from config import VARIABLES
+from fragments import fragment_response
 
 router = APIRouter()
 templates = Jinja2Templates(directory="templates")
 
+SYSTEM_TAGS = ["ntp_sync", "sys_version", "sys_name", "sw_version"]
+
 @router.get("/system", response_class=HTMLResponse)
 async def exploitation_page(request: Request):
     return templates.TemplateResponse("system.html", {"request": request})
 
+def render_infos(values):
+    ntp_sync = values["ntp_sync"]
+    sys_version = values["sys_version"]
+    sys_name = values["sys_name"]
+    sw_version = values["sw_version"]
+    
+    html = f"""
+    <div class="data-row">
+        <span class="label">NTP SYNC</span>
+        <span class="value">{ntp_sync}</span>
+    </div>
+    <div class="data-row">
+        <span class="label">SYS VERSION</span>
+        <span class="value">{sys_version}</span>
+    </div>
+    <div class="data-row">
+        <span class="label">SYS NAME</span>
+        <span class="value">{sys_name}</span>
+    </div>
+    <div class="data-row">
+        <span class="label">SW</span>
+        <span class="value">{sw_version}</span>
+    </div>
+    """
+    
+    return html
+
 @router.get("/api/system/infos")
-async def get_infos_data():
+async def get_infos_data(request: Request = None):
+    try:
+        from main import get_snapshot
+        return fragment_response(request, get_snapshot(), "system", SYSTEM_TAGS, render_infos)
+    except Exception as e:
+        return HTMLResponse(f'<div class="data-row"><span class="label">Error: {str(e)}</span></div>')
+
+@router.get("/api/system/breakers")
+async def get_breakers():
     try:
         from main import get_opcua_client
-        opcua = get_opcua_client()
-        
-        ntp_sync = await opcua.read_variable(VARIABLES["ntp_sync"])
-        sys_version = await opcua.read_variable(VARIABLES["sys_version"])
-        sys_name = await opcua.read_variable(VARIABLES["sys_name"])
-        sw_version = await opcua.read_variable(VARIABLES["sw_version"])
-        
-        html = f"""
-        <div class="data-row">
-            <span class="label">NTP SYNC</span>
-            <span class="value">{ntp_sync}</span>
-        </div>
-        <div class="data-row">
-            <span class="label">SYS VERSION</span>
-            <span class="value">{sys_version}</span>
-        </div>
-        <div class="data-row">
-            <span class="label">SYS NAME</span>
-            <span class="value">{sys_name}</span>
-        </div>
-        <div class="data-row">
-            <span class="label">SW</span>
-            <span class="value">{sw_version}</span>
-        </div>
-        """
-        
-        return HTMLResponse(html)
+        breaker = getattr(get_opcua_client(), "breaker", None)
+        return JSONResponse(breaker.stats() if breaker else {"threshold": 0, "open": 0, "nodes": {}})
     except Exception as e:
-        return HTMLResponse(f'<div class="data-row"><span class="label">Error: {str(e)}</span></div>')
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -0,0 +1,66 @@
+import asyncio
+import time
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import HTMLResponse, JSONResponse
+from starlette.requests import Request
+from fastapi.templating import Jinja2Templates
+
+from routers.history import DEFAULT_WINDOW_S, history_payload
+from tags import TAGS
+
+router = APIRouter()
+templates = Jinja2Templates(directory="templates")
+
+PDC_HCS = ["hc1p1", "hc1p2", "hc2p3", "hc2p4"]
+
+TREND_GROUPS = {
+    "Modules Vdc": [f"m{i}_vdc" for i in range(1, 15)],
+    "Modules Idc": [f"m{i}_idc" for i in range(1, 15)],
+    "PDC courant": [f"{hc}_current" for hc in PDC_HCS],
+    "PDC tension": [f"{hc}_voltage" for hc in PDC_HCS],
+    "SOC": [f"evi{i}_soc" for i in range(1, 5)],
+    "Températures pistolet": [f"evi{i}_temp{n}" for i in range(1, 5) for n in (1, 2)],
+    "Températures DCBM": [f"dcbm{i}_temp_{n}" for i in range(1, 5) for n in ("h", "l")],
+}
+
+TREND_TAGS = {name for names in TREND_GROUPS.values() for name in names if name in TAGS}
+
+MAX_TREND_TAGS = 16
+
+
+@router.get("/trends", response_class=HTMLResponse)
+async def trends_page(request: Request):
+    groups = {label: [name for name in names if name in TREND_TAGS] for label, names in TREND_GROUPS.items()}
+    return templates.TemplateResponse("trends.html", {"request": request, "groups": groups, "max_tags": MAX_TREND_TAGS})
+
+
+@router.get("/api/trends")
+async def get_trends(
+    tags: str,
+    start: Optional[float] = Query(None, alias="from"),
+    end: Optional[float] = Query(None, alias="to"),
+    max_points: int = Query(500, ge=3, le=5000),
+):
+    from main import get_historian
+    historian = get_historian()
+    names = list(dict.fromkeys(name for name in tags.split(",") if name))
+    unknown = [name for name in names if name not in TREND_TAGS or name not in historian]
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Sans historique: {', '.join(unknown)}")
+    if not names or len(names) > MAX_TREND_TAGS:
+        raise HTTPException(status_code=400, detail=f"1 à {MAX_TREND_TAGS} tags")
+    end = time.time() if end is None else end
+    start = end - DEFAULT_WINDOW_S if start is None else start
+    if start >= end:
+        raise HTTPException(status_code=400, detail="from doit précéder to")
+    try:
+        samples = await asyncio.gather(*(historian.query(name, start, end) for name in names))
+        series = await asyncio.to_thread(lambda: {
+            name: history_payload(timestamps, values, name, start, end, max_points, None, "minmax")
+            for name, (timestamps, values) in zip(names, samples)
+        })
+        return JSONResponse({"from": start, "to": end, "max_points": max_points, "series": series})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
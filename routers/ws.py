@@ -0,0 +1,128 @@
+import asyncio
+import json
+from functools import partial
+from fastapi import APIRouter, BackgroundTasks, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import Response
+
+from routers import sequences, exploitation, communication, system, synoptique
+
+router = APIRouter()
+
+COMMAND_TASKS = set()
+
+TOPICS = {
+    **{pdc: partial(sequences.get_pdc_data, pdc) for pdc in sequences.PDCS},
+    **{cs: partial(exploitation.get_cs_data, cs) for cs in exploitation.CHARGING_STATIONS},
+    "communication": communication.get_communication,
+    "modules": communication.get_modules_status,
+    "system": system.get_infos_data,
+    "synoptique": synoptique.get_synoptique_data,
+}
+
+
+async def render_topic(topic: str) -> dict:
+    response = await TOPICS[topic]()
+    if not isinstance(response, Response):
+        return {"topic": topic, "data": response}
+    if response.media_type == "application/json":
+        return {"topic": topic, "data": json.loads(response.body)}
+    return {"topic": topic, "html": response.body.decode()}
+
+
+async def run_command(seq: str, cmd: str, report) -> dict:
+    background_tasks = BackgroundTasks()
+    try:
+        await sequences.execute_command(seq, cmd, background_tasks)
+    except HTTPException as e:
+        return {"topic": "command", "seq": seq, "cmd": cmd, "status": "error", "detail": e.detail}
+    task = asyncio.create_task(background_tasks())
+    COMMAND_TASKS.add(task)
+    task.add_done_callback(COMMAND_TASKS.discard)
+    task.add_done_callback(partial(command_done, seq, cmd, report))
+    return {"topic": "command", "seq": seq, "cmd": cmd, "status": "ok"}
+
+
+def command_done(seq: str, cmd: str, report, task: asyncio.Task):
+    if task.cancelled():
+        report({"topic": "command", "seq": seq, "cmd": cmd, "status": "error", "detail": "Commande annulée"})
+    elif task.exception() is not None:
+        report({"topic": "command", "seq": seq, "cmd": cmd, "status": "error", "detail": str(task.exception())})
+
+
+def message_error(message) -> str:
+    if not isinstance(message, dict):
+        return "Objet JSON attendu"
+    for key in ("subscribe", "unsubscribe"):
+        topics = message.get(key, [])
+        if not isinstance(topics, list) or not all(isinstance(topic, str) for topic in topics):
+            return f"{key}: liste de topics attendue"
+    command = message.get("command")
+    if command is not None and not (
+        isinstance(command, dict) and isinstance(command.get("seq"), str) and isinstance(command.get("cmd"), str)
+    ):
+        return 'command: {"seq": ..., "cmd": ...} attendu'
+    return ""
+
+
+async def finish_commands():
+    await asyncio.gather(*COMMAND_TASKS, return_exceptions=True)
+
+
+@router.websocket("/ws")
+async def hmi_socket(websocket: WebSocket):
+    from main import get_scan_engine
+    engine = get_scan_engine()
+    await websocket.accept()
+
+    topics = set()
+    last_sent = {}
+    replies = []
+    wake = asyncio.Event()
+
+    def report(reply: dict):
+        replies.append(reply)
+        wake.set()
+
+    async def receive():
+        try:
+            while True:
+                try:
+                    message = await websocket.receive_json()
+                except (ValueError, KeyError):
+                    message = None
+                error = message_error(message)
+                if error:
+                    report({"topic": "error", "detail": error})
+                    continue
+                topics.update(topic for topic in message.get("subscribe", []) if topic in TOPICS)
+                for topic in message.get("unsubscribe", []):
+                    topics.discard(topic)
+                    last_sent.pop(topic, None)
+                command = message.get("command")
+                if command:
+                    report(await run_command(command["seq"], command["cmd"], report))
+                wake.set()
+        except WebSocketDisconnect:
+            pass
+
+    receiver = asyncio.create_task(receive())
+    try:
+        while not receiver.done():
+            wake.clear()
+            while replies:
+                await websocket.send_json(replies.pop(0))
+            for topic in sorted(topics):
+                payload = await render_topic(topic)
+                if last_sent.get(topic) != payload:
+                    last_sent[topic] = payload
+                    await websocket.send_json(payload)
+
+            updated = asyncio.create_task(engine.wait_for_update(engine.snapshot.version))
+            woken = asyncio.create_task(wake.wait())
+            await asyncio.wait({updated, woken, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            updated.cancel()
+            woken.cancel()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
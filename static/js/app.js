@@ -1,4 +1,53 @@
+const HMISocket = (() => {
+    const handlers = {};
+    let socket = null;
+
+    function connect() {
+        const protocol = location.protocol === 'https:' ? 'wss' : 'ws';
+        socket = new WebSocket(`${protocol}://${location.host}/ws`);
+        socket.onopen = () => socket.send(JSON.stringify({ subscribe: Object.keys(handlers) }));
+        socket.onmessage = (event) => {
+            const message = JSON.parse(event.data);
+            if (message.status === 'error' || message.topic === 'error') console.error('HMI socket:', message);
+            if (handlers[message.topic]) handlers[message.topic](message);
+        };
+        socket.onclose = () => {
+            socket = null;
+            setTimeout(connect, 2000);
+        };
+    }
+
+    function send(message) {
+        if (!socket || socket.readyState !== WebSocket.OPEN) return false;
+        socket.send(JSON.stringify(message));
+        return true;
+    }
+
+    return {
+        subscribe(topic, handler) {
+            handlers[topic] = handler;
+            if (!socket) connect();
+            send({ subscribe: [topic] });
+        },
+        command(seq, cmd) {
+            return send({ command: { seq, cmd } });
+        },
+    };
+})();
+
 document.addEventListener('DOMContentLoaded', function() {
+    document.querySelectorAll('[data-ws-topic]').forEach(element => {
+        HMISocket.subscribe(element.dataset.wsTopic, (message) => {
+            element.innerHTML = message.html;
+            htmx.process(element);
+        });
+    });
+
+    document.body.addEventListener('htmx:confirm', event => {
+        const match = (event.detail.path || '').match(/^\/api\/sequences\/([^/]+)\/([^/]+)$/);
+        if (match && event.detail.verb === 'post' && HMISocket.command(match[1], match[2])) event.preventDefault();
+    });
+
     const navItems = document.querySelectorAll('.nav-item');
     const views = document.querySelectorAll('.view');
     const pageTitle = document.querySelector('.page-title');
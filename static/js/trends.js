@@ -0,0 +1,209 @@
+const TrendChart = (() => {
+    const COLORS = ['#2563eb', '#16a34a', '#dc2626', '#d97706', '#7c3aed', '#0891b2', '#db2777', '#4d7c0f',
+                    '#9333ea', '#0f766e', '#b91c1c', '#1d4ed8', '#ca8a04', '#15803d', '#be185d', '#475569'];
+    const LIVE_REFRESH_MS = 10000;
+    const MARGIN = { left: 56, right: 12, top: 10, bottom: 26 };
+
+    let canvas, ctx, status, legend;
+    let range = 3600;
+    let view = null;
+    let data = null;
+    let request = 0;
+    let drag = null;
+
+    function selectedTags() {
+        return [...document.querySelectorAll('.trend-tag input:checked')].map(input => input.value);
+    }
+
+    function limitSelection() {
+        const container = document.querySelector('.trend-tags');
+        const full = selectedTags().length >= Number(container.dataset.maxTags);
+        container.querySelectorAll('.trend-tag input').forEach(input => { input.disabled = full && !input.checked; });
+    }
+
+    function liveWindow() {
+        const now = Date.now() / 1000;
+        return { from: now - range, to: now, live: true };
+    }
+
+    async function fetchSeries(tags, bounds, maxPoints) {
+        const params = new URLSearchParams({ tags: tags.join(','), from: bounds.from, to: bounds.to, max_points: maxPoints });
+        const response = await fetch(`/api/trends?${params}`);
+        if (!response.ok) throw new Error((await response.json()).detail || response.status);
+        return response.json();
+    }
+
+    async function load() {
+        const tags = selectedTags();
+        const current = ++request;
+        if (!tags.length) {
+            data = null;
+            draw();
+            return;
+        }
+        const width = plotWidth();
+        const bounds = view;
+        try {
+            for (const maxPoints of [Math.max(3, Math.round(width / 8)), Math.max(3, Math.round(width))]) {
+                const result = await fetchSeries(tags, bounds, maxPoints);
+                if (current !== request) return;
+                data = result;
+                status.textContent = '';
+                draw();
+            }
+        } catch (error) {
+            if (current === request) status.textContent = `Erreur historique: ${error.message}`;
+        }
+    }
+
+    function plotWidth() {
+        return canvas.clientWidth - MARGIN.left - MARGIN.right;
+    }
+
+    function points(series) {
+        const values = series.avg || series.values;
+        return series.timestamps.map((t, i) => [t, values[i], series.min ? series.min[i] : values[i], series.max ? series.max[i] : values[i]]);
+    }
+
+    function draw() {
+        const ratio = window.devicePixelRatio || 1;
+        canvas.width = canvas.clientWidth * ratio;
+        canvas.height = canvas.clientHeight * ratio;
+        ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+        const width = canvas.clientWidth;
+        const height = canvas.clientHeight;
+        ctx.clearRect(0, 0, width, height);
+        legend.innerHTML = '';
+        if (!data) return;
+
+        const series = Object.entries(data.series).map(([name, s], i) => ({ name, color: COLORS[i % COLORS.length], points: points(s) }));
+        let low = Infinity, high = -Infinity;
+        for (const s of series) {
+            for (const [t, , min, max] of s.points) {
+                if (t < view.from || t > view.to) continue;
+                if (min !== null) low = Math.min(low, min);
+                if (max !== null) high = Math.max(high, max);
+            }
+        }
+        if (!isFinite(low)) { low = 0; high = 1; }
+        if (low === high) { low -= 1; high += 1; }
+
+        const x = t => MARGIN.left + (t - view.from) / (view.to - view.from) * (width - MARGIN.left - MARGIN.right);
+        const y = v => MARGIN.top + (high - v) / (high - low) * (height - MARGIN.top - MARGIN.bottom);
+
+        drawAxes(width, height, low, high, x, y);
+        ctx.save();
+        ctx.beginPath();
+        ctx.rect(MARGIN.left, MARGIN.top, width - MARGIN.left - MARGIN.right, height - MARGIN.top - MARGIN.bottom);
+        ctx.clip();
+        for (const s of series) {
+            ctx.fillStyle = s.color + '22';
+            for (const [t, , min, max] of s.points) {
+                if (min === null || max === null || min === max) continue;
+                ctx.fillRect(x(t) - 1, y(max), 2, Math.max(1, y(min) - y(max)));
+            }
+            ctx.strokeStyle = s.color;
+            ctx.lineWidth = 1.5;
+            ctx.beginPath();
+            let pen = false;
+            for (const [t, value] of s.points) {
+                if (value === null) { pen = false; continue; }
+                if (pen) ctx.lineTo(x(t), y(value)); else ctx.moveTo(x(t), y(value));
+                pen = true;
+            }
+            ctx.stroke();
+
+            const item = document.createElement('span');
+            item.className = 'trend-legend-item';
+            item.innerHTML = `<span class="trend-swatch" style="background:${s.color}"></span>${s.name}`;
+            legend.appendChild(item);
+        }
+        ctx.restore();
+        if (drag) {
+            ctx.fillStyle = 'rgba(59, 130, 246, 0.15)';
+            ctx.fillRect(Math.min(drag.start, drag.end), MARGIN.top, Math.abs(drag.end - drag.start), height - MARGIN.top - MARGIN.bottom);
+        }
+    }
+
+    function drawAxes(width, height, low, high, x, y) {
+        ctx.strokeStyle = '#d1e6d8';
+        ctx.fillStyle = '#5a6c62';
+        ctx.font = '10px "Roboto Mono", monospace';
+        ctx.lineWidth = 1;
+        for (let i = 0; i <= 4; i++) {
+            const value = low + (high - low) * i / 4;
+            ctx.beginPath();
+            ctx.moveTo(MARGIN.left, y(value));
+            ctx.lineTo(width - MARGIN.right, y(value));
+            ctx.stroke();
+            ctx.fillText(value.toFixed(1), 4, y(value) + 3);
+        }
+        const span = view.to - view.from;
+        for (let i = 0; i <= 5; i++) {
+            const t = view.from + span * i / 5;
+            const date = new Date(t * 1000);
+            const label = span > 86400
+                ? date.toLocaleString('fr-FR', { day: '2-digit', month: '2-digit', hour: '2-digit', minute: '2-digit' })
+                : date.toLocaleTimeString('fr-FR', span > 3600 ? { hour: '2-digit', minute: '2-digit' } : {});
+            ctx.fillText(label, Math.min(x(t), width - 70), height - 8);
+        }
+    }
+
+    function timeAt(px) {
+        return view.from + (px - MARGIN.left) / plotWidth() * (view.to - view.from);
+    }
+
+    function exportCsv() {
+        const tags = selectedTags();
+        if (!tags.length) return;
+        const params = new URLSearchParams({ tags: tags.join(','), from: view.from, to: view.to, format: 'csv' });
+        window.location = `/api/export?${params}`;
+    }
+
+    function zoom(from, to) {
+        if (to - from < 5) return;
+        view = { from, to, live: false };
+        draw();
+        load();
+    }
+
+    function init() {
+        canvas = document.getElementById('trendCanvas');
+        ctx = canvas.getContext('2d');
+        status = document.getElementById('trendStatus');
+        legend = document.getElementById('trendLegend');
+        view = liveWindow();
+
+        document.querySelectorAll('.trend-tag input').forEach(input => input.addEventListener('change', () => {
+            limitSelection();
+            load();
+        }));
+        document.querySelectorAll('.trend-ranges [data-range]').forEach(button => button.addEventListener('click', () => {
+            document.querySelectorAll('.trend-ranges [data-range]').forEach(other => other.classList.remove('active'));
+            button.classList.add('active');
+            range = Number(button.dataset.range);
+            view = liveWindow();
+            load();
+        }));
+
+        canvas.addEventListener('mousedown', event => { drag = { start: event.offsetX, end: event.offsetX }; });
+        canvas.addEventListener('mousemove', event => { if (drag) { drag.end = event.offsetX; draw(); } });
+        canvas.addEventListener('mouseup', () => {
+            const selection = drag;
+            drag = null;
+            if (!selection || Math.abs(selection.end - selection.start) < 5) return draw();
+            zoom(timeAt(Math.min(selection.start, selection.end)), timeAt(Math.max(selection.start, selection.end)));
+        });
+        document.getElementById('trendExport').addEventListener('click', exportCsv);
+
+        canvas.addEventListener('dblclick', () => { view = liveWindow(); load(); });
+        window.addEventListener('resize', draw);
+        setInterval(() => { if (view.live) { view = liveWindow(); load(); } }, LIVE_REFRESH_MS);
+        limitSelection();
+        load();
+    }
+
+    return { init };
+})();
+
+document.addEventListener('DOMContentLoaded', TrendChart.init);
@@ -0,0 +1,74 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from asyncua import ua
+
+from config import (
+    VARIABLES, SYNOPTIQUE_VARIABLES, SCAN_CLASSES, DEFAULT_SCAN_CLASS, SCAN_CLASS_TAGS, TEXT_TAGS,
+)
+
+
+@dataclass(frozen=True)
+class Tag:
+    name: str
+    node_id: str
+    ua_node_id: ua.NodeId
+    numeric: bool
+    scan_class: str
+
+
+class TagRegistry:
+    def __init__(self, variables: dict):
+        scan_classes = {name: scan_class for scan_class, names in SCAN_CLASS_TAGS.items() for name in names}
+        text_tags = set(TEXT_TAGS)
+        self.tags = {}
+        self.by_node_id = {}
+        for name, node_id in variables.items():
+            tag = Tag(
+                name=name,
+                node_id=node_id,
+                ua_node_id=ua.NodeId.from_string(node_id),
+                numeric=name not in text_tags,
+                scan_class=scan_classes.get(name, DEFAULT_SCAN_CLASS),
+            )
+            self.tags[name] = tag
+            self.by_node_id.setdefault(node_id, tag)
+
+        self.by_scan_class = {}
+        for scan_class in SCAN_CLASSES:
+            tags = tuple(tag for tag in self.tags.values() if tag.scan_class == scan_class)
+            if tags:
+                self.by_scan_class[scan_class] = tags
+
+        self.by_lower_node_id = {}
+        for node_id in self.by_node_id:
+            self.by_lower_node_id.setdefault(node_id.lower(), []).append(node_id)
+
+    def __getitem__(self, name: str) -> Tag:
+        return self.tags[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.tags
+
+    def __iter__(self):
+        return iter(self.tags)
+
+    def __len__(self) -> int:
+        return len(self.tags)
+
+    def node_id(self, name: str) -> str:
+        return self.tags[name].node_id
+
+    def name(self, node_id: str) -> Optional[str]:
+        tag = self.by_node_id.get(node_id)
+        return tag.name if tag else None
+
+    def case_variants(self, node_id: str) -> list:
+        return [other for other in self.by_lower_node_id.get(node_id.lower(), []) if other != node_id]
+
+    def ua_node_id(self, node_id: str) -> ua.NodeId:
+        tag = self.by_node_id.get(node_id)
+        return tag.ua_node_id if tag else ua.NodeId.from_string(node_id)
+
+
+TAGS = TagRegistry({**VARIABLES, **SYNOPTIQUE_VARIABLES})
@@ -0,0 +1,59 @@
+import asyncio
+from types import SimpleNamespace
+
+from asyncua import ua
+from asyncua.client.ua_client import UaClientState
+
+from breaker import CircuitBreaker, CLOSED, OPEN
+from opcua_client import OPCUAClient
+from tags import TAGS
+
+NODE_ID = next(iter(TAGS.by_node_id))
+
+
+class FakePLC:
+    def __init__(self):
+        self.mode = "bad"
+
+    async def read(self, params):
+        if self.mode == "raise":
+            raise ConnectionError("liaison coupée")
+        if self.mode == "bad":
+            return [ua.DataValue(StatusCode=ua.StatusCode(ua.StatusCodes.BadNodeIdUnknown)) for _ in params.NodesToRead]
+        return [ua.DataValue(ua.Variant(1.5)) for _ in params.NodesToRead]
+
+
+def fake_client(plc: FakePLC) -> OPCUAClient:
+    client = OPCUAClient("opc.tcp://fake")
+    client.client = SimpleNamespace(state=UaClientState.CONNECTED, uaclient=plc)
+    client.breaker = CircuitBreaker(threshold=3, backoff_s=0)
+    return client
+
+
+def test_failed_probe_reopens_then_recovers():
+    async def scenario():
+        plc = FakePLC()
+        client = fake_client(plc)
+        for _ in range(3):
+            await client.read_variables([NODE_ID])
+        assert client.breaker.nodes[NODE_ID].state == OPEN
+
+        plc.mode = "raise"
+        [data_value] = await client.read_variables([NODE_ID])
+        assert data_value.StatusCode.is_bad()
+        assert client.breaker.nodes[NODE_ID].state == OPEN
+
+        plc.mode = "good"
+        [data_value] = await client.read_variables([NODE_ID])
+        assert data_value.StatusCode.is_good()
+        assert data_value.Value.Value == 1.5
+        assert client.breaker.nodes[NODE_ID].state == CLOSED
+
+    asyncio.run(scenario())
+
+
+def test_stuck_half_open_probe_is_retried():
+    breaker = CircuitBreaker(threshold=1, backoff_s=0)
+    breaker.failure(NODE_ID, "BadNodeIdUnknown")
+    assert breaker.allow(NODE_ID)
+    assert breaker.allow(NODE_ID)